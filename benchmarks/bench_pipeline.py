@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Pipeline benchmark - sequential checks vs. the concurrent KidGuard.run
+
+Every component is replaced by a stub that only sleeps, so the numbers
+show the effect of the loop structure alone. Time-to-intervention is
+measured from the start of a check to the action being queued.
+
+Usage:
+    python benchmarks/bench_pipeline.py [seconds per run]
+"""
+
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+from loguru import logger
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from kidguard import KidGuard
+from src.settings import Action, Settings
+
+# Stage latencies in seconds
+IDENTIFY = 0.3
+VIDEO_INFO = 0.02
+FRAME = 0.2          # capture_clip takes one frame per "second" of clip
+ANALYZE = 0.8
+NOTIFY = 0.5
+CLIP_DURATION = 5
+CHECK_INTERVAL = 1.0
+
+
+class StubDetector:
+    async def is_youtube_active(self):
+        return True
+
+    async def capture_clip(self, duration=5):
+        await asyncio.sleep(duration * FRAME)
+        return {"frames": ["stub.png"], "audio": None}
+
+
+class StubFaceRecognizer:
+    async def identify_viewer(self):
+        await asyncio.sleep(IDENTIFY)
+        return {"name": "Kid", "age": 5, "is_child": True, "confidence": 0.9}
+
+    async def warm_up(self):
+        pass
+
+    def start_watching(self):
+        pass
+
+    def set_check_interval(self, seconds):
+        pass
+
+    def release_camera(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class StubBrowser:
+    def __init__(self):
+        self.videos = 0
+
+    async def get_current_video_info(self):
+        await asyncio.sleep(VIDEO_INFO)
+        self.videos += 1
+        return {"video_id": f"video{self.videos}"}
+
+    async def get_up_next(self, limit=5):
+        return []
+
+    async def connect(self):
+        return False
+
+    async def push_blocklist(self, video_ids):
+        return True
+
+    async def close(self):
+        pass
+
+
+class StubAnalyzer:
+    client = None
+
+    async def warm_up(self):
+        pass
+
+    async def analyze(self, clip):
+        await asyncio.sleep(ANALYZE)
+        return {"inappropriate": True, "reason": "stub", "categories": [], "severity": "high", "confidence": 1.0}
+
+
+class StubNotifier:
+    async def notify(self, viewer, analysis, action_taken):
+        await asyncio.sleep(NOTIFY)
+
+
+class StubPrefetcher:
+    def get_verdict(self, video_id):
+        return None
+
+    def blocked_video_ids(self):
+        return set()
+
+    async def prefetch(self, candidates):
+        pass
+
+    async def close(self):
+        pass
+
+
+class StubDispatcher:
+    def __init__(self):
+        self.submitted = []
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def submit(self, action, handler, *args, video_id=None):
+        self.submitted.append(time.monotonic())
+        return True
+
+
+def make_app() -> KidGuard:
+    app = KidGuard("benchmarks/no-config.yaml")
+    app.config["rules"].update(
+        action="notify_only", check_interval=CHECK_INTERVAL, clip_duration=CLIP_DURATION
+    )
+    app.config["power"] = {"enabled": False}
+    app.settings = Settings.from_config(app.config)
+    app.governor.update(app.settings.power)
+    app.detector = StubDetector()
+    app.face_recognizer = StubFaceRecognizer()
+    app.browser_controller = StubBrowser()
+    app.content_analyzer = StubAnalyzer()
+    app.notifier = StubNotifier()
+    app.prefetcher = StubPrefetcher()
+    app.action_dispatcher = StubDispatcher()
+    return app
+
+
+async def run_sequential(app: KidGuard, seconds: float) -> list[float]:
+    """The original loop: every stage awaited in turn, then the full interval."""
+    latencies = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        if await app.detector.is_youtube_active():
+            viewer = await app.face_recognizer.identify_viewer()
+            if viewer and viewer.get("is_child"):
+                video = await app.browser_controller.get_current_video_info()
+                clip = await app.detector.capture_clip(duration=CLIP_DURATION)
+                analysis = await app.content_analyzer.analyze(clip)
+                if analysis.get("inappropriate") and app._take_action(Action.NOTIFY_ONLY, analysis, video["video_id"]):
+                    latencies.append(time.monotonic() - started)
+                    await app.notifier.notify(viewer=viewer, analysis=analysis, action_taken=Action.NOTIFY_ONLY)
+            await app.prefetcher.prefetch(await app.browser_controller.get_up_next())
+            await app._sync_blocklist()
+        await asyncio.sleep(CHECK_INTERVAL)
+    return latencies
+
+
+async def run_pipeline(app: KidGuard, seconds: float) -> list[float]:
+    """KidGuard.run as shipped."""
+    latencies = []
+    act = app._act
+
+    def timed_act(check):
+        queued = act(check)
+        if queued:
+            latencies.append(app.action_dispatcher.submitted[-1] - check.started)
+        return queued
+
+    app._act = timed_act
+    task = asyncio.create_task(app.run())
+    await asyncio.sleep(seconds)
+    app.stop()
+    await task
+    return latencies
+
+
+def report(name: str, latencies: list[float], seconds: float):
+    if not latencies:
+        print(f"{name:<11} no interventions")
+        return
+    print(
+        f"{name:<11} interventions: {len(latencies):>3} in {seconds:.0f}s | "
+        f"time-to-intervention mean {statistics.mean(latencies) * 1000:6.0f}ms, "
+        f"max {max(latencies) * 1000:6.0f}ms"
+    )
+
+
+async def main():
+    seconds = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    print(
+        f"Stages: identify {IDENTIFY}s, capture {CLIP_DURATION * FRAME}s, analyze {ANALYZE}s, "
+        f"notify {NOTIFY}s, interval {CHECK_INTERVAL}s\n"
+    )
+    report("sequential", await run_sequential(make_app(), seconds), seconds)
+    report("pipeline", await run_pipeline(make_app(), seconds), seconds)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
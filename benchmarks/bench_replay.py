@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Replay benchmark - run a recorded session through the real pipeline
+
+Replays a recording from `recording.enabled` (or a synthetic one) with
+the webcam, screen, browser and Claude API stubbed out, and reports
+throughput and time-to-intervention. No display, webcam or network is
+needed, so this can run in CI.
+
+Usage:
+    python benchmarks/bench_replay.py recordings/session_20260101_200000.jsonl
+    python benchmarks/bench_replay.py --synthetic 50 --speed 0 --max-p95 500
+
+--speed scales all recorded delays: 1 = real time, 0 = as fast as possible.
+With --max-p95 the exit code is 1 if the p95 time-to-intervention (ms)
+is above the limit.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+from pathlib import Path
+from loguru import logger
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from src.replay.player import Recording, ReplaySession
+
+
+def synthetic_recording(checks: int, seed: int = 1) -> Recording:
+    """A session of `checks` checks with typical stage latencies.
+
+    One video in four is inappropriate; a few checks find YouTube closed.
+    """
+    rng = random.Random(seed)
+    events = [{"t": 0.0, "component": "session", "method": "config", "duration": 0.0,
+               "result": {"check_interval": 2.0, "clip_duration": 5, "action": "skip"}}]
+
+    def add(component, method, duration, result):
+        events.append({"t": round(t, 4), "component": component, "method": method,
+                       "duration": round(duration, 4), "result": result})
+
+    t = 0.0
+    for i in range(checks):
+        active = rng.random() > 0.1
+        add("detector", "is_youtube_active", 0.005, active)
+        if active:
+            add("face", "identify_viewer", rng.uniform(0.05, 0.3),
+                {"name": "Kid", "age": 6, "is_child": True, "confidence": 0.9})
+            add("browser", "get_current_video_info", 0.02,
+                {"video_id": f"video{i}", "title": f"Video {i}", "channel": "Channel"})
+            add("detector", "capture_clip", 1.0, {"frames": [f"{i:040x}"]})
+            bad = rng.random() < 0.25
+            add("analyzer", "analyze", rng.uniform(0.6, 2.0), {
+                "inappropriate": bad, "reason": "synthetic", "categories": ["violence"] if bad else [],
+                "severity": "high" if bad else "none", "confidence": 0.9,
+                "recommendation": "block" if bad else "allow",
+            })
+            if bad:
+                add("browser", "skip_video", 0.05, True)
+            add("browser", "get_up_next", 0.03, [])
+        t += 2.0
+    return Recording(events)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("recording", nargs="?", help="session recording (.jsonl)")
+    parser.add_argument("--synthetic", type=int, metavar="CHECKS", help="replay a generated session instead")
+    parser.add_argument("--speed", type=float, default=1.0, help="time scale (1 = real time, 0 = fast)")
+    parser.add_argument("--max-p95", type=float, metavar="MS", help="fail if p95 time-to-intervention is above this")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    if args.recording:
+        recording = Recording.load(args.recording)
+    elif args.synthetic:
+        recording = synthetic_recording(args.synthetic)
+    else:
+        parser.error("give a recording or --synthetic N")
+
+    logger.remove()
+    logger.add(sys.stderr, level="ERROR")
+
+    report = await ReplaySession(recording, time_scale=args.speed, config_path="benchmarks/no-config.yaml").run()
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        tti = report["time_to_intervention_ms"]
+        print(
+            f"{report['checks']} checks ({report['recorded_seconds']:.1f}s recorded) replayed in "
+            f"{report['wall_seconds']:.2f}s at speed {args.speed} - {report['checks_per_second']} checks/s\n"
+            f"interventions: {report['interventions']} | time-to-intervention "
+            + ", ".join(f"{k} {'-' if v is None else f'{v:.0f}ms'}" for k, v in tti.items())
+        )
+
+    p95 = report["time_to_intervention_ms"].get("p95")
+    if args.max_p95 is not None and p95 is not None and p95 > args.max_p95:
+        print(f"FAIL: p95 time-to-intervention {p95:.0f}ms > {args.max_p95:.0f}ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
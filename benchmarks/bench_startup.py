@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark - time from launch to the first completed check
+
+Starts KidGuard in a fresh interpreter per run and reports how long the
+import, the setup and the first check took, and which heavy SDKs were
+loaded by then. Profiles:
+
+    minimal  AI analysis, notifications and CDP disabled
+    full     everything enabled (dummy credentials, no network needed)
+    eager    like full, with the SDKs imported up front as before lazy loading
+
+Usage:
+    python benchmarks/bench_startup.py [runs per profile]
+"""
+
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+HEAVY_MODULES = ["anthropic", "telegram", "playwright", "cv2", "numpy", "face_recognition"]
+
+PROFILES = {
+    "minimal": {
+        "analysis": {"use_ai_analysis": False},
+        "notifications": {"enabled": False},
+        "browser": {"use_cdp": False},
+    },
+    "full": {
+        "claude": {"api_key": "sk-bench"},
+        "analysis": {"use_ai_analysis": True},
+        "notifications": {"enabled": True, "telegram": {"enabled": True, "bot_token": "1:bench", "chat_id": "1"}},
+        # Nothing listens here, so the connection attempt fails fast
+        "browser": {"use_cdp": True, "cdp_url": "http://127.0.0.1:9"},
+    },
+}
+PROFILES["eager"] = PROFILES["full"]
+
+
+def child(started: float, config_path: str, eager: bool):
+    """Runs in the benchmarked interpreter; prints timings as JSON."""
+    import asyncio
+
+    if eager:
+        import anthropic, telegram, playwright.async_api  # noqa: F401,E401
+    t_startup = time.time()
+
+    sys.path.insert(0, str(ROOT))
+    from loguru import logger
+    logger.remove()
+    from kidguard import KidGuard
+    t_import = time.time()
+
+    app = KidGuard(config_path)
+    t_init = time.time()
+
+    first_check = {}
+    check = app._check
+
+    async def timed_check(check_started):
+        await check(check_started)
+        first_check.setdefault("done", time.time())
+        app.stop()
+
+    app._check = timed_check
+    asyncio.run(app.run())
+
+    print(json.dumps({
+        "startup_ms": (t_startup - started) * 1000,
+        "import_ms": (t_import - t_startup) * 1000,
+        "init_ms": (t_init - t_import) * 1000,
+        "first_check_ms": (first_check["done"] - started) * 1000,
+        "loaded": [m for m in HEAVY_MODULES if m in sys.modules],
+    }))
+
+
+def run_profile(name: str, config_dir: Path) -> dict:
+    config = {
+        **PROFILES[name],
+        "face": {"encodings_dir": str(config_dir / "encodings")},
+        "rules": {"check_interval": 0.1},  # exit soon after the first check
+    }
+    config_path = config_dir / f"{name}.yaml"
+    config_path.write_text(json.dumps(config), encoding="utf-8")  # JSON is valid YAML
+
+    started = time.time()
+    out = subprocess.run(
+        [sys.executable, __file__, "--child", str(started), str(config_path), str(name == "eager")],
+        cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in PROFILES:
+            results = [run_profile(name, Path(tmp)) for _ in range(runs)]
+            median = {
+                key: statistics.median(r[key] for r in results)
+                for key in ("startup_ms", "import_ms", "init_ms", "first_check_ms")
+            }
+            print(
+                f"{name:<8} first check {median['first_check_ms']:6.0f}ms "
+                f"(python {median['startup_ms']:5.0f}, import {median['import_ms']:5.0f}, "
+                f"init {median['init_ms']:5.0f}) | loaded: {', '.join(results[-1]['loaded']) or '-'}"
+            )
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--child":
+        child(float(sys.argv[2]), sys.argv[3], sys.argv[4] == "True")
+    else:
+        main()
@@ -8,105 +8,542 @@ Main entry point for the application.
 import asyncio
 import signal
 import sys
+import time
+from dataclasses import dataclass
 from pathlib import Path
 from loguru import logger
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
-from src.detection.youtube_detector import YouTubeDetector
+from src.detection.youtube_detector import YouTubeDetector, read_window_title
+from src.detection.keyword_filter import KeywordFilter
+from src.detection.prefetcher import UpNextPrefetcher
 from src.vision.face_recognition import FaceRecognizer
 from src.vision.content_analyzer import ContentAnalyzer
-from src.control.browser_controller import BrowserController
+from src.control.browser_controller import BrowserController, DEFAULT_OVERLAY_MESSAGE
+from src.control.action_dispatcher import ActionDispatcher
 from src.notification.telegram_notifier import TelegramNotifier
-from src.config import load_config
+from src.utils.file_watcher import FileWatcher
+from src.utils.log_sink import close_logging, setup_logging
+from src.metrics import MetricsServer, metrics
+from src.power import PowerGovernor, PowerLevel
+from src.tracing import tracer
+from src.config import diff_config, load_config
+from src.settings import Action, ConfigError, Settings
+
+
+# Settings (or whole sections) that only take effect on restart
+RESTART_SETTINGS = {
+    "claude.api_key", "analysis.use_ai_analysis", "camera", "metrics", "recording", "logging",
+    "browser.use_cdp", "browser.cdp_url",
+    "face.workers", "face.encodings_dir", "face.age_model", "face.age_model_config",
+    "face.age_input_size", "face.age_input_mean", "face.age_input_scale", "face.age_input_swap_rb",
+    "face.track_iou",
+}
+
+
+@dataclass
+class Check:
+    """One pass of the protection loop, carried through the pipeline stages."""
+
+    started: float
+    trace: object = None
+    viewer: dict | None = None
+    video: dict | None = None
+    capture: asyncio.Task | None = None
+    analysis: dict | None = None
+    queued_at: float = 0.0
+    # Tells videos apart for the action cooldown when there's no video ID
+    window_title: str | None = None
 
 
 class KidGuard:
     """Main KidGuard application."""
     
     def __init__(self, config_path: str = "config/config.yaml"):
+        self.config_path = Path(config_path)
         self.config = load_config(config_path)
+        # Validated once here; the loop only reads these typed settings
+        self.settings = Settings.from_config(self.config)
         self.running = False
         
         # Initialize components
         self.detector = YouTubeDetector()
-        self.face_recognizer = FaceRecognizer(self.config.get("family", []))
+        self.face_recognizer = FaceRecognizer(
+            self.config.get("family", []),
+            self.config.get("camera", {}),
+            {
+                **self.config.get("face", {}),
+                "max_child_age": self.settings.rules.max_child_age
+            }
+        )
 
         # Prepare analyzer config with custom rules
         analyzer_config = {
             **self.config.get("claude", {}),
+            "use_ai_analysis": self.settings.analysis.use_ai_analysis,
             "custom_rules": self.config.get("analysis", {}).get("custom_rules", {}),
-            "max_child_age": self.config.get("rules", {}).get("max_child_age", 12)
+            "max_child_age": self.settings.rules.max_child_age
         }
         self.content_analyzer = ContentAnalyzer(analyzer_config)
 
-        self.browser_controller = BrowserController()
+        self.browser_controller = BrowserController(self.config.get("browser", {}))
+        self.action_dispatcher = ActionDispatcher(
+            cooldown=self.settings.rules.action_cooldown
+        )
+        self.prefetcher = UpNextPrefetcher(
+            keyword_filter=KeywordFilter.from_config(self.config.get("analysis", {})),
+            content_analyzer=self.content_analyzer if self.content_analyzer.enabled else None
+        )
         self.notifier = TelegramNotifier(self.config.get("notifications", {}))
+
+        # Keeps the loop under its CPU budget (stricter on battery)
+        self.governor = PowerGovernor(self.settings.power)
+        # Viewer reused on checks the governor skips the face check for
+        self._last_viewer = None
+
+        # Video IDs blocked this session, mirrored into the YouTube tab
+        self.blocked_video_ids = set()
+        self._pushed_blocklist = set()
+
+        # Pipeline state: clips waiting for analysis, notifications in flight
+        self._pending_clips = asyncio.Queue(maxsize=1)
+        self._notifications = set()
+
+        # Edits to the config file apply without a restart
+        self.config_watcher = FileWatcher([self.config_path], self._on_config_changed)
+        self._loop = None
+
+        tracer.configure(self.config.get("tracing", {}))
+
+        # Optionally record the session for replay benchmarks
+        self.recorder = None
+        if self.config.get("recording", {}).get("enabled", False):
+            from src.replay.recorder import SessionRecorder
+            self.recorder = SessionRecorder.from_config(self.config["recording"])
+            self.recorder.attach(self)
+
+        metrics_config = self.config.get("metrics", {})
+        self.metrics_server = None
+        if metrics_config.get("enabled", False):
+            self.metrics_server = MetricsServer(
+                metrics,
+                host=metrics_config.get("host", "127.0.0.1"),
+                port=metrics_config.get("port", 9108)
+            )
         
         logger.info("KidGuard initialized")
     
     async def run(self):
-        """Main run loop."""
+        """Main run loop.
+        
+        Checks start every `check_interval` seconds. Within a check, viewer
+        identification and clip capture run in parallel; the clip is then
+        handed to a background analysis stage, so analyzing one clip
+        overlaps with the next check. Notifications don't hold up either.
+        Models load in the background, so the first check isn't delayed.
+        The power governor may lengthen the interval and shrink the work
+        per check to stay within the CPU budget.
+        """
         self.running = True
+        self._loop = asyncio.get_running_loop()
+        await self.action_dispatcher.start()
+        self.face_recognizer.start_watching()
+        self.config_watcher.start()
+        if self.metrics_server:
+            self.metrics_server.start()
+        warm_up_task = asyncio.create_task(self._warm_up())
+        analysis_task = asyncio.create_task(self._analysis_loop())
         logger.info("KidGuard started - protecting your kids 🛡️")
         
         while self.running:
+            started = time.monotonic()
+            self._apply_power_level(self.governor.sample(started))
             try:
-                # Step 1: Check if YouTube is open
-                youtube_active = await self.detector.is_youtube_active()
-                
-                if youtube_active:
-                    logger.debug("YouTube detected")
-                    
-                    # Step 2: Identify viewer
-                    viewer = await self.face_recognizer.identify_viewer()
-                    
-                    if viewer and viewer.get("is_child", False):
-                        logger.info(f"Child detected: {viewer['name']} (age {viewer['age']})")
-                        
-                        # Step 3: Capture and analyze content
-                        clip = await self.detector.capture_clip(
-                            duration=self.config.get("rules", {}).get("clip_duration", 5)
-                        )
-                        
-                        analysis = await self.content_analyzer.analyze(clip)
-                        
-                        # Step 4: Take action if needed
-                        if analysis.get("inappropriate", False):
-                            logger.warning(f"Inappropriate content detected: {analysis['reason']}")
-                            
-                            # Take action
-                            action = self.config.get("rules", {}).get("action", "redirect")
-                            await self._take_action(action, analysis)
-                            
-                            # Notify parent
-                            await self.notifier.notify(
-                                viewer=viewer,
-                                analysis=analysis,
-                                action_taken=action
-                            )
-                
-                # Wait before next check
-                interval = self.config.get("rules", {}).get("check_interval", 30)
-                await asyncio.sleep(interval)
-                
+                await self._check(started)
             except Exception as e:
                 logger.error(f"Error in main loop: {e}")
                 await asyncio.sleep(5)
+                continue
+            
+            # Wait before next check
+            interval = self.settings.rules.check_interval * self.governor.level.interval_factor
+            await asyncio.sleep(max(0.0, interval - (time.monotonic() - started)))
+
+        # Warm-up is left to finish: a half-started Playwright driver can't be closed
+        analysis_task.cancel()
+        await asyncio.gather(warm_up_task, analysis_task, *self._notifications, return_exceptions=True)
+        self.config_watcher.stop()
+        if self.metrics_server:
+            self.metrics_server.stop()
+        await self.action_dispatcher.stop()
+        self.face_recognizer.close()
+        await self.prefetcher.close()
+        await self.browser_controller.close()
+        tracer.close()
+        if self.recorder:
+            self.recorder.close()
+    
+    async def _warm_up(self):
+        """Load the face models, the Claude client and the browser connection.
+
+        Runs alongside the first checks; a stage that needs something not
+        ready yet simply waits for it.
+        """
+        started = time.monotonic()
+        results = await asyncio.gather(
+            self.face_recognizer.warm_up(),
+            self.content_analyzer.warm_up(),
+            self.browser_controller.connect(),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, Exception):
+                logger.warning(f"Warm-up failed: {result}")
+        logger.info(f"Warm-up finished in {time.monotonic() - started:.1f}s")
+    
+    async def _check(self, started: float):
+        """One protection check, traced as one decision."""
+        check = Check(started, trace=tracer.begin("check"))
+        handed_off = False
+        try:
+            with tracer.activate(check.trace):
+                handed_off = await self._run_check(check)
+        finally:
+            # Otherwise the analysis or action stage finishes the trace
+            if not handed_off:
+                self._finish(check)
+    
+    async def _run_check(self, check: Check) -> bool:
+        """Run a check up to handing it to analysis.
+        
+        Returns:
+            True if a later stage took over the check
+        """
+        metrics.event("check")
+        
+        # Step 1: Check if YouTube is open
+        with metrics.timer("detect"):
+            youtube_active = await self.detector.is_youtube_active()
+        
+        if not youtube_active:
+            # Nobody to protect right now - don't keep the webcam on
+            self.face_recognizer.release_camera()
+            self._last_viewer = None
+            return False
+        
+        logger.debug("YouTube detected")
+        
+        # Step 2: Identify viewer while already capturing; the clip is dropped
+        # if no child is watching or the video was vetted in advance
+        check.capture = asyncio.create_task(metrics.timed("capture", self.detector.capture_clip(
+            duration=self.settings.rules.clip_duration
+        )))
+        try:
+            check.viewer, check.video = await asyncio.gather(
+                self._identify_viewer(),
+                metrics.timed("video_info", self.browser_controller.get_current_video_info())
+            )
+        except BaseException:
+            check.capture.cancel()
+            raise
+        
+        handed_off = False
+        viewer, video = check.viewer, check.video
+        if viewer and viewer.get("is_child", False):
+            logger.info(f"Child detected: {viewer['name']} (age {viewer['age']})")
+            metrics.event("child_detected")
+            if not (video and video.get("video_id")):
+                check.window_title = await self._read_window_title()
+            
+            # Step 3: Use the prefetched verdict if autoplay landed on a
+            # vetted video, otherwise analyze the clip in the background
+            analysis = self.prefetcher.get_verdict(video and video.get("video_id"))
+            if video and video.get("channel_id") in self.settings.safe_channel_ids:
+                logger.debug(f"Safe channel: {video.get('channel')}")
+                metrics.event("safe_channel")
+                check.capture.cancel()
+            elif analysis and analysis.get("final"):
+                logger.debug(f"Using prefetched verdict for {video['video_id']}")
+                check.capture.cancel()
+                check.analysis = self._link_trace(analysis, check)
+                handed_off = self._act(check)
+            else:
+                self._queue_analysis(check)
+                handed_off = True
+        else:
+            check.capture.cancel()
+        
+        # Step 5: Vet what autoplay will play next, and let the page
+        # stop known-bad videos itself when they load
+        with metrics.timer("prefetch"):
+            await self.prefetcher.prefetch(await self.browser_controller.get_up_next())
+            await self._sync_blocklist()
+        
+        return handed_off
+    
+    async def _identify_viewer(self) -> dict | None:
+        """Identify the viewer, or reuse the last one on checks the governor skips."""
+        if self.governor.face_check_due() or self._last_viewer is None:
+            self._last_viewer = await metrics.timed("identify", self.face_recognizer.identify_viewer())
+        else:
+            metrics.event("face_check_skipped")
+        return self._last_viewer
+    
+    @staticmethod
+    async def _read_window_title() -> str | None:
+        """Title of the YouTube window (without CDP), if it can be read."""
+        try:
+            info = await asyncio.to_thread(read_window_title)
+        except Exception as e:
+            logger.debug(f"Could not read window titles: {e}")
+            return None
+        return info["full_title"] if info else None
+    
+    def _apply_power_level(self, level: PowerLevel):
+        """Size the next clips and the face tracking for the current power level."""
+        self.detector.capture_scale = level.capture_scale
+        self.detector.max_frames = level.max_frames
+        self.detector.png_level = level.png_level
+        self.face_recognizer.set_check_interval(
+            self.settings.rules.check_interval * level.interval_factor * level.face_every
+        )
+    
+    def _queue_analysis(self, check: Check):
+        """Hand a check to the analysis stage; a newer clip replaces a waiting one."""
+        if self._pending_clips.full():
+            stale = self._pending_clips.get_nowait()
+            stale.capture.cancel()
+            self._finish(stale, dropped=True)
+            logger.debug("Analysis is behind, dropping the older clip")
+        check.queued_at = time.monotonic()
+        self._pending_clips.put_nowait(check)
+    
+    async def _analysis_loop(self):
+        """Analyze captured clips as they come in."""
+        while True:
+            check = await self._pending_clips.get()
+            metrics.observe_stage("analysis_queue", time.monotonic() - check.queued_at)
+            handed_off = False
+            try:
+                with tracer.activate(check.trace):
+                    clip = await check.capture
+                    with metrics.timer("analysis"):
+                        analysis = await self.content_analyzer.analyze(clip)
+                check.analysis = self._link_trace(analysis, check)
+                handed_off = self._act(check)
+            except Exception as e:
+                logger.error(f"Error in analysis: {e}")
+            finally:
+                check.capture.cancel()
+                if not handed_off:
+                    self._finish(check)
+    
+    @staticmethod
+    def _link_trace(analysis: dict, check: Check) -> dict:
+        """Copy of the verdict that names the trace it was made in."""
+        if check.trace is None:
+            return analysis
+        linked = {**analysis, "trace_id": check.trace.trace_id}
+        if analysis.get("trace_id"):
+            # Prefetched verdicts keep a link to the trace that produced them
+            linked["prefetch_trace_id"] = analysis["trace_id"]
+        return linked
+    
+    def _finish(self, check: Check, **details):
+        """Close the trace of a check with a summary of the decision."""
+        if check.trace is None:
+            return
+        if check.viewer:
+            details["viewer"] = check.viewer.get("name")
+        if check.video:
+            details["video_id"] = check.video.get("video_id")
+        if check.analysis:
+            details["inappropriate"] = check.analysis.get("inappropriate", False)
+            details["reason"] = check.analysis.get("reason")
+        tracer.end(check.trace, **details)
+    
+    def _act(self, check: Check) -> bool:
+        """Step 4: Take action if needed, then notify without waiting.
+        
+        Returns:
+            True if an action was queued; it finishes the check's trace
+        """
+        analysis = check.analysis
+        policy = self.settings.analysis
+        if not policy.blocks(analysis):
+            if policy.warns(analysis):
+                logger.warning(f"Content warning: {analysis.get('reason')} ({', '.join(analysis.get('categories', []))})")
+                metrics.event("warning")
+            return False
+        if not analysis.get("inappropriate", False):
+            # Blocked by a configured category the analyzer didn't block itself
+            analysis = check.analysis = {**analysis, "inappropriate": True}
+        
+        trace_note = f" [trace {analysis['trace_id']}]" if analysis.get("trace_id") else ""
+        logger.warning(f"Inappropriate content detected: {analysis['reason']}{trace_note}")
+        metrics.event("inappropriate")
+        
+        # Take action (once per video; repeats are coalesced)
+        action = self.settings.rules.action
+        video_id = check.video.get("video_id") if check.video else None
+        
+        if not self._take_action(action, analysis, video_id, check):
+            return False
+        
+        logger.info(f"Intervention queued {(time.monotonic() - check.started) * 1000:.0f}ms after check start")
+        
+        # Notify parent
+        task = asyncio.create_task(metrics.timed("notify", self.notifier.notify(
+            viewer=check.viewer,
+            analysis=analysis,
+            action_taken=action
+        )))
+        self._notifications.add(task)
+        task.add_done_callback(self._notifications.discard)
+        return True
     
-    async def _take_action(self, action: str, analysis: dict):
+    def _take_action(
+        self, action: Action, analysis: dict, video_id: str | None = None, check: Check | None = None
+    ) -> bool:
+        """Queue action on inappropriate content.
+
+        Returns:
+            False if the same action for this video is already queued or cooling down
+        """
+        # Without CDP, the window title stands in for the video ID
+        video_key = video_id or (check.window_title if check else None)
+        return self.action_dispatcher.submit(
+            action, self._execute_action, action, analysis, video_id, check, video_id=video_key
+        )
+
+    async def _execute_action(
+        self, action: Action, analysis: dict, video_id: str | None = None, check: Check | None = None
+    ):
         """Take action on inappropriate content."""
-        if action == "skip":
+        trace = check.trace if check else None
+        try:
+            with tracer.activate(trace), tracer.span("action", action=action):
+                await self._perform_action(action, video_id)
+        finally:
+            if check is not None:
+                metrics.time_to_intervention.observe(time.monotonic() - check.started)
+                self._finish(check, action=action)
+
+    async def _perform_action(self, action: Action, video_id: str | None = None):
+        if video_id and action is not Action.NOTIFY_ONLY:
+            self.blocked_video_ids.add(video_id)
+
+        if action is Action.OVERLAY:
+            # Pause and cover the page in one round trip; fall back to pausing
+            if not await self.browser_controller.show_block_overlay():
+                await self.browser_controller.pause_video()
+        elif action is Action.SKIP:
             await self.browser_controller.skip_video()
-        elif action == "redirect":
-            safe_channels = self.config.get("safe_channels", [])
-            if safe_channels:
-                await self.browser_controller.redirect_to_channel(safe_channels[0]["id"])
-        elif action == "pause":
+        elif action is Action.REDIRECT:
+            if self.settings.redirect_channel_id:
+                await self.browser_controller.redirect_to_channel(self.settings.redirect_channel_id)
+        elif action is Action.PAUSE:
             await self.browser_controller.pause_video()
         # notify_only: just log and notify, no browser action
+
+    async def _sync_blocklist(self):
+        """Push blocked video IDs to the YouTube tab when the set changed."""
+        if self.settings.rules.action is Action.NOTIFY_ONLY:
+            return
+
+        blocklist = self.blocked_video_ids | self.prefetcher.blocked_video_ids()
+        if blocklist and blocklist != self._pushed_blocklist:
+            if await self.browser_controller.push_blocklist(blocklist):
+                self._pushed_blocklist = blocklist
     
+    def _on_config_changed(self, path: Path):
+        """Reload the edited config file (watcher thread).
+        
+        Only what changed is rebuilt. Expensive parts are compiled here;
+        the swap itself runs on the event loop between two steps of the
+        pipeline, so no stage sees half of an update.
+        """
+        if not path.exists():
+            return
+
+        try:
+            config = load_config(str(path))
+        except Exception as e:
+            logger.error(f"Could not reload config: {e}")
+            return
+
+        if not isinstance(config, dict):
+            return
+
+        changes = diff_config(self.config, config)
+        if not changes:
+            return
+
+        # A broken edit is rejected as a whole; the running settings stay
+        try:
+            settings = Settings.from_config(config)
+        except ConfigError as e:
+            logger.error(f"Config not reloaded: {e}")
+            return
+
+        keyword_filter = None
+        if changes & {"analysis.keyword_filter", "analysis.custom_rules"}:
+            keyword_filter = KeywordFilter.from_config(config.get("analysis", {}))
+
+        if self._loop is not None and self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._apply_config, config, settings, changes, keyword_filter)
+        else:
+            self._apply_config(config, settings, changes, keyword_filter)
+
+    def _apply_config(
+        self, config: dict, settings: Settings, changes: set[str], keyword_filter: KeywordFilter | None
+    ):
+        """Swap in a reloaded config, updating only the affected components.
+        
+        Queued clips, running analyses, pending actions and the face and
+        verdict caches are kept.
+        """
+        sections = {change.split(".")[0] for change in changes}
+        max_child_age = settings.rules.max_child_age
+
+        if "family" in changes:
+            self.face_recognizer.update_family(config.get("family", []))
+        if "face" in sections or "rules.max_child_age" in changes:
+            self.face_recognizer.update_settings({**config.get("face", {}), "max_child_age": max_child_age})
+        if changes & {"analysis.custom_rules", "claude.model", "rules.max_child_age"}:
+            self.content_analyzer.update_rules({
+                **config.get("claude", {}),
+                "custom_rules": config.get("analysis", {}).get("custom_rules", {}),
+                "max_child_age": max_child_age
+            })
+        if keyword_filter is not None:
+            self.prefetcher.update_keyword_filter(keyword_filter)
+        if "rules.action_cooldown" in changes:
+            self.action_dispatcher.cooldown = settings.rules.action_cooldown
+        if "browser.overlay_message" in changes:
+            self.browser_controller.overlay_message = (
+                config.get("browser", {}).get("overlay_message", DEFAULT_OVERLAY_MESSAGE)
+            )
+        if "notifications" in sections:
+            # Notifications already being sent finish on the old notifier
+            self.notifier = TelegramNotifier(config.get("notifications", {}))
+        if "tracing" in sections:
+            tracer.configure(config.get("tracing", {}))
+        if "power" in sections:
+            self.governor.update(settings.power)
+
+        # Everything else (check_interval, action, safe channels, ...) is
+        # read from the settings when used
+        self.config = config
+        self.settings = settings
+        logger.info(f"Config reloaded: {', '.join(sorted(changes))}")
+
+        restart = sorted(c for c in changes if c in RESTART_SETTINGS or c.split(".")[0] in RESTART_SETTINGS)
+        if restart:
+            logger.warning(f"Restart KidGuard to apply: {', '.join(restart)}")
+
     def stop(self):
         """Stop the application."""
         logger.info("Stopping KidGuard...")
@@ -115,22 +552,17 @@ class KidGuard:
 
 def main():
     """Entry point."""
-    # Configure logging
-    logger.remove()
-    logger.add(
-        sys.stderr,
-        format="<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | {message}",
-        level="INFO"
-    )
-    logger.add(
-        "logs/kidguard.log",
-        rotation="10 MB",
-        retention="7 days",
-        level="DEBUG"
-    )
+    # Configure logging: sinks only queue messages, writer threads do the I/O
+    setup_logging()
     
     # Create application
-    app = KidGuard()
+    try:
+        app = KidGuard()
+    except ConfigError as e:
+        logger.error(f"Invalid config: {e}")
+        close_logging()
+        sys.exit(1)
+    setup_logging(app.config)
     
     # Handle shutdown signals
     def shutdown(sig, frame):
@@ -146,6 +578,7 @@ def main():
         logger.info("Interrupted by user")
     
     logger.info("KidGuard stopped. Stay safe! 👋")
+    close_logging()
 
 
 if __name__ == "__main__":
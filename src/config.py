@@ -21,6 +21,29 @@ def load_config(config_path: str = "config/config.yaml") -> dict:
     return config
 
 
+def diff_config(old: dict, new: dict) -> set[str]:
+    """Settings that differ between two configs.
+
+    Sections are compared one level deep, so the result names what changed
+    without listing every nested rule, e.g. {"family", "rules.action",
+    "analysis.keyword_filter"}.
+    """
+    changes = set()
+    for section in old.keys() | new.keys():
+        before, after = old.get(section), new.get(section)
+        if before == after:
+            continue
+        if isinstance(before, dict) and isinstance(after, dict):
+            changes.update(
+                f"{section}.{key}"
+                for key in before.keys() | after.keys()
+                if before.get(key) != after.get(key)
+            )
+        else:
+            changes.add(section)
+    return changes
+
+
 def get_default_config() -> dict:
     """Return default configuration."""
     return {
@@ -28,12 +51,29 @@ def get_default_config() -> dict:
             "model": "claude-sonnet-4-5"
         },
         "family": [],
+        "face": {
+            "tolerance": 0.6,
+            "detection_scale": 0.5,
+            "reencode_ttl": 30,
+            "viewer_ttl": 120,
+            "workers": 1
+        },
+        "camera": {
+            "source": 0,
+            "warmup_frames": 5,
+            "idle_timeout": 60
+        },
         "rules": {
             "max_child_age": 12,
             "action": "redirect",
+            "action_cooldown": 30,
             "check_interval": 30,
             "clip_duration": 5
         },
+        "browser": {
+            "use_cdp": True,
+            "cdp_url": "http://127.0.0.1:9222"
+        },
         "safe_channels": [],
         "analysis": {
             "block_categories": ["violence", "horror", "adult"],
@@ -42,6 +82,14 @@ def get_default_config() -> dict:
         "notifications": {
             "enabled": False
         },
+        "metrics": {
+            "enabled": False
+        },
+        "power": {
+            "enabled": True,
+            "cpu_percent": 20,
+            "battery_cpu_percent": 10
+        },
         "privacy": {
             "delete_clips": True,
             "local_only": True
@@ -0,0 +1,168 @@
+"""Action dispatch module.
+
+Queues interventions so they run off the monitoring loop, and drops
+duplicate actions for the same video while one is queued or cooling down.
+"""
+
+import asyncio
+import inspect
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from loguru import logger
+
+from src.metrics import metrics
+
+
+@dataclass
+class ActionJob:
+    """A queued intervention."""
+
+    action: str
+    video_id: str | None
+    handler: object
+    args: tuple = ()
+    submitted_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def key(self) -> tuple:
+        # Without an ID, all actions of a kind count as the current video
+        return (self.video_id or "", self.action)
+
+
+class ActionDispatcher:
+    """Runs browser actions one at a time on a worker task.
+
+    `submit` never blocks: it returns False when the same action for the
+    same video is already queued or finished less than `cooldown` seconds
+    ago. Callers that can't tell videos apart by ID should pass another
+    video identity (e.g. the window title); without one, repeats of an
+    action share a single key. Handlers can be coroutine functions or
+    plain (blocking) functions; the latter run in a thread so `pyautogui`
+    pauses don't stall the loop.
+
+    Use `await start()` from an asyncio program, or `start_background()`
+    from synchronous code to run the worker on its own thread.
+    """
+
+    def __init__(self, cooldown: float = 30.0, history: int = 100):
+        self.cooldown = cooldown
+        self.latencies = deque(maxlen=history)
+
+        self._loop = None
+        self._queue = None
+        self._worker = None
+        self._thread = None
+        self._lock = threading.Lock()
+        self._queued: set[tuple] = set()
+        self._last_done: dict[tuple, float] = {}
+
+    async def start(self):
+        """Start the worker on the running event loop."""
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._worker = asyncio.create_task(self._run())
+        logger.debug("ActionDispatcher started")
+
+    def start_background(self):
+        """Start the worker on a dedicated thread (for synchronous callers)."""
+        loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=loop.run_forever, name="action-dispatcher", daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.start(), loop).result()
+
+    async def stop(self):
+        """Stop the worker; queued actions are dropped."""
+        if self._worker:
+            self._worker.cancel()
+            await asyncio.gather(self._worker, return_exceptions=True)
+            self._worker = None
+
+    def stop_background(self):
+        """Stop a worker started with `start_background`."""
+        if self._thread and self._loop:
+            asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result(timeout=5)
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def submit(self, action: str, handler, *args, video_id: str | None = None) -> bool:
+        """Queue an action. Safe to call from any thread.
+
+        Args:
+            action: action name, used for de-duplication
+            handler: callable (sync or async) that performs the action
+            video_id: video the action targets; None means "current video"
+
+        Returns:
+            True if queued, False if coalesced with an earlier identical action
+        """
+        if self._loop is None:
+            raise RuntimeError("ActionDispatcher not started")
+
+        job = ActionJob(action, video_id, handler, args)
+        now = time.monotonic()
+
+        with self._lock:
+            if job.key in self._queued:
+                logger.debug(f"Coalesced duplicate action: {action} ({video_id})")
+                return False
+
+            last = self._last_done.get(job.key)
+            if last is not None and now - last < self.cooldown:
+                logger.debug(f"Action in cooldown: {action} ({video_id})")
+                return False
+
+            self._queued.add(job.key)
+
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, job)
+        return True
+
+    async def _run(self):
+        while True:
+            job = await self._queue.get()
+            started = time.monotonic()
+            metrics.observe_stage("action_queue", started - job.submitted_at)
+            try:
+                if inspect.iscoroutinefunction(job.handler):
+                    await job.handler(*job.args)
+                else:
+                    await asyncio.to_thread(job.handler, *job.args)
+            except Exception as e:
+                logger.error(f"Action {job.action} failed: {e}")
+            finally:
+                done = time.monotonic()
+                latency = done - job.submitted_at
+                self.latencies.append(latency)
+                metrics.observe_stage("action", done - started)
+                metrics.events.inc(event="action", action=job.action)
+
+                with self._lock:
+                    self._queued.discard(job.key)
+                    self._last_done[job.key] = done
+                    # Forget entries whose cooldown has long expired
+                    if len(self._last_done) > 1000:
+                        self._last_done = {
+                            k: t for k, t in self._last_done.items() if done - t < self.cooldown
+                        }
+
+                logger.info(f"Action {job.action} completed in {latency * 1000:.0f} ms")
+
+    @property
+    def pending(self) -> int:
+        """Actions queued or running."""
+        with self._lock:
+            return len(self._queued)
+
+    def stats(self) -> dict:
+        """Completion latency summary (seconds) over recent actions."""
+        if not self.latencies:
+            return {"count": 0, "p50": None, "max": None}
+
+        ordered = sorted(self.latencies)
+        return {
+            "count": len(ordered),
+            "p50": ordered[len(ordered) // 2],
+            "max": ordered[-1],
+        }
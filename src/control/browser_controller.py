@@ -1,106 +1,387 @@
 """Browser control module.
 
 Controls YouTube playback via browser automation.
+
+The preferred path is a long-lived Chrome DevTools Protocol connection
+(Playwright `connect_over_cdp`) to the browser the child is using, started
+with `--remote-debugging-port=9222`. Every action is a small in-page script
+on the exact YouTube tab. Keyboard shortcuts and `webbrowser.open` remain
+as a fallback when no debugging port is available.
 """
 
 import asyncio
+import importlib.util
+import time
 from loguru import logger
 
-try:
-    from playwright.async_api import async_playwright
-except ImportError:
-    async_playwright = None
+from src.detection.prefetcher import UP_NEXT_SCRIPT
+
+# Playwright is imported by the first `connect`, so keyboard-only setups
+# never load it
+PLAYWRIGHT_AVAILABLE = importlib.util.find_spec("playwright") is not None
+
+
+SKIP_SCRIPT = """() => {
+    const next = document.querySelector('a.ytp-next-button');
+    if (next && next.offsetParent !== null) { next.click(); return true; }
+    return false;
+}"""
+
+PAUSE_SCRIPT = """() => {
+    const video = document.querySelector('video');
+    if (!video) return false;
+    video.pause();
+    return true;
+}"""
+
+NAVIGATE_SCRIPT = """(url) => { window.location.href = url; return true; }"""
+
+# Pauses every <video> and covers the page. Shared by the one-shot overlay and
+# the in-page blocklist guard; later plays are re-paused while the overlay is up.
+_BLOCK_FUNCTION = """function __kidguardBlock(message, videoId) {
+    document.querySelectorAll('video').forEach((v) => { v.pause(); v.muted = true; });
+    if (!document.documentElement) return false;
+
+    let overlay = document.getElementById('kidguard-overlay');
+    if (!overlay) {
+        overlay = document.createElement('div');
+        overlay.id = 'kidguard-overlay';
+        overlay.style.cssText = 'position:fixed;inset:0;z-index:2147483647;' +
+            'background:rgba(12,12,24,0.97);color:#fff;display:flex;align-items:center;' +
+            'justify-content:center;text-align:center;padding:48px;white-space:pre-line;' +
+            'font:600 32px/1.5 system-ui,sans-serif';
+        document.documentElement.appendChild(overlay);
+    }
+    if (!window.__kidguardPlayGuard) {
+        window.__kidguardPlayGuard = true;
+        document.addEventListener('play', (e) => {
+            if (document.getElementById('kidguard-overlay')) e.target.pause();
+        }, true);
+    }
+    overlay.dataset.videoId = videoId || '';
+    overlay.textContent = '🛡️\\n' + message;
+    return true;
+}"""
+
+BLOCK_OVERLAY_SCRIPT = """(message) => {
+    """ + _BLOCK_FUNCTION + """
+    return __kidguardBlock(message, new URLSearchParams(window.location.search).get('v'));
+}"""
+
+# Installs (once per document) a guard that blocks listed video IDs on its own:
+# on SPA navigation and on every play event, without a round trip to Python.
+# The list lives in localStorage so it survives full reloads.
+_GUARD_INSTALL = """(() => {
+    if (window.__kidguardGuard) return;
+    """ + _BLOCK_FUNCTION + """
+    const load = (key, fallback) => {
+        try { return JSON.parse(localStorage.getItem(key)) || fallback; } catch (e) { return fallback; }
+    };
+    const guard = {
+        blocked: new Set(load('kidguard.blocklist', [])),
+        message: load('kidguard.message', ''),
+        check() {
+            const id = new URLSearchParams(window.location.search).get('v');
+            const overlay = document.getElementById('kidguard-overlay');
+            if (id && guard.blocked.has(id)) {
+                __kidguardBlock(guard.message, id);
+            } else if (overlay && overlay.dataset.videoId !== (id || '')) {
+                overlay.remove();
+            }
+        },
+        update(ids, message) {
+            guard.blocked = new Set(ids);
+            guard.message = message;
+            localStorage.setItem('kidguard.blocklist', JSON.stringify(ids));
+            localStorage.setItem('kidguard.message', JSON.stringify(message));
+            guard.check();
+        }
+    };
+    window.__kidguardGuard = guard;
+    document.addEventListener('yt-navigate-finish', guard.check);
+    document.addEventListener('play', guard.check, true);
+    window.addEventListener('popstate', guard.check);
+    if (document.readyState === 'loading') {
+        document.addEventListener('DOMContentLoaded', guard.check);
+    } else {
+        guard.check();
+    }
+})();"""
+
+PUSH_BLOCKLIST_SCRIPT = """(args) => {
+    """ + _GUARD_INSTALL + """
+    window.__kidguardGuard.update(args.ids, args.message);
+    return true;
+}"""
+
+DEFAULT_OVERLAY_MESSAGE = "偵測到不適當的內容！\n此影片可能不適合兒童觀看。"
+
+VIDEO_INFO_SCRIPT = """() => {
+    const params = new URLSearchParams(window.location.search);
+    const video = document.querySelector('video');
+    const text = (sel) => {
+        const el = document.querySelector(sel);
+        return el ? el.textContent.trim() : null;
+    };
+    // The player's response follows in-app navigation, unlike ytInitialPlayerResponse
+    const channelId = () => {
+        const player = document.querySelector('#movie_player');
+        const details = player && player.getPlayerResponse && player.getPlayerResponse();
+        return (details && details.videoDetails && details.videoDetails.channelId) || null;
+    };
+    return {
+        video_id: params.get('v'),
+        url: window.location.href,
+        title: text('h1.ytd-watch-metadata yt-formatted-string') || document.title.replace(/ - YouTube$/, ''),
+        channel: text('ytd-watch-metadata ytd-channel-name a') || text('ytd-channel-name a'),
+        channel_id: channelId(),
+        paused: video ? video.paused : null,
+        current_time: video ? video.currentTime : null
+    };
+}"""
 
 
 class BrowserController:
     """Controls browser for YouTube manipulation."""
-    
-    def __init__(self):
+
+    def __init__(self, config: dict | None = None):
+        config = config or {}
+        self.cdp_url = config.get("cdp_url", "http://127.0.0.1:9222")
+        self.use_cdp = config.get("use_cdp", True) and PLAYWRIGHT_AVAILABLE
+        self.overlay_message = config.get("overlay_message", DEFAULT_OVERLAY_MESSAGE)
+
+        self.playwright = None
         self.browser = None
-        self.context = None
+        self.page = None
+        self._guarded_page = None
+        self._connect_lock = asyncio.Lock()
+        self._cdp_unavailable_until = 0.0
         logger.info("BrowserController initialized")
-    
+
     async def skip_video(self):
         """Skip to the next video in playlist/autoplay."""
         logger.info("Skipping current video")
-        
-        # Method 1: Keyboard shortcut (Shift+N for next)
+
+        if await self._click_next_button():
+            return
+
+        # Fallback: keyboard shortcut (Shift+N for next)
         await self._send_keyboard_shortcut("shift+n")
-        
-        # Method 2: If that doesn't work, try clicking next button
-        # await self._click_next_button()
-    
+
     async def redirect_to_channel(self, channel_id: str):
         """Redirect to a safe channel.
-        
+
         Args:
             channel_id: YouTube channel ID
         """
         url = f"https://www.youtube.com/channel/{channel_id}/videos"
         logger.info(f"Redirecting to safe channel: {channel_id}")
-        
+
         await self._navigate(url)
-    
+
     async def redirect_to_video(self, video_id: str):
         """Redirect to a specific video.
-        
+
         Args:
             video_id: YouTube video ID
         """
         url = f"https://www.youtube.com/watch?v={video_id}"
         logger.info(f"Redirecting to video: {video_id}")
-        
+
         await self._navigate(url)
-    
+
     async def pause_video(self):
         """Pause the current video."""
         logger.info("Pausing video")
+
+        if await self._run_script(PAUSE_SCRIPT):
+            return
+
         await self._send_keyboard_shortcut("k")  # K is pause/play in YouTube
-    
+
+    async def show_block_overlay(self, message: str | None = None) -> bool:
+        """Pause the video and cover the YouTube tab in a single round trip.
+
+        Returns:
+            False if no YouTube tab is reachable over CDP
+        """
+        logger.info("Showing block overlay")
+        return bool(await self._run_script(BLOCK_OVERLAY_SCRIPT, message or self.overlay_message))
+
+    async def push_blocklist(self, video_ids) -> bool:
+        """Send known-bad video IDs to the YouTube tab.
+
+        The in-page guard then stops those videos as soon as they load,
+        including on autoplay, without waiting for the next check.
+        """
+        page = await self._get_youtube_page()
+        if page is None:
+            return False
+
+        if self._guarded_page is not page:
+            # Re-install the guard after full page loads as well
+            try:
+                await page.add_init_script(_GUARD_INSTALL)
+                self._guarded_page = page
+            except Exception as e:
+                logger.warning(f"Could not install blocklist guard: {e}")
+
+        ids = sorted(video_ids)
+        ok = bool(await self._run_script(PUSH_BLOCKLIST_SCRIPT, {"ids": ids, "message": self.overlay_message}))
+        if ok:
+            logger.debug(f"Pushed {len(ids)} blocked video IDs to the YouTube tab")
+        return ok
+
+    async def connect(self) -> bool:
+        """Open (or reuse) the CDP connection to the user's browser.
+
+        Returns:
+            True if a connection is available
+        """
+        if not self.use_cdp:
+            return False
+
+        if self.browser is not None and self.browser.is_connected():
+            return True
+
+        # Don't hammer a browser that was started without a debugging port
+        if time.monotonic() < self._cdp_unavailable_until:
+            return False
+
+        async with self._connect_lock:
+            if self.browser is not None and self.browser.is_connected():
+                return True
+
+            await self._disconnect()
+            try:
+                from playwright.async_api import async_playwright
+                self.playwright = await async_playwright().start()
+                self.browser = await self.playwright.chromium.connect_over_cdp(self.cdp_url)
+                logger.info(f"Connected to browser over CDP at {self.cdp_url}")
+                return True
+            except Exception as e:
+                logger.warning(f"CDP connection failed ({e}), falling back to keyboard control")
+                await self._disconnect()
+                self._cdp_unavailable_until = time.monotonic() + 30
+                return False
+
+    async def close(self):
+        """Drop the CDP connection (the user's browser keeps running)."""
+        async with self._connect_lock:
+            await self._disconnect()
+
+    async def _disconnect(self):
+        self.page = None
+        self._guarded_page = None
+        if self.browser is not None:
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+            self.browser = None
+        if self.playwright is not None:
+            try:
+                await self.playwright.stop()
+            except Exception:
+                pass
+            self.playwright = None
+
+    async def _get_youtube_page(self):
+        """Find the YouTube tab, reusing the cached page while it stays valid."""
+        if not await self.connect():
+            return None
+
+        page = self.page
+        if page is not None and not page.is_closed() and "youtube.com" in page.url:
+            return page
+
+        pages = [
+            p for context in self.browser.contexts for p in context.pages
+            if "youtube.com" in p.url
+        ]
+        if not pages:
+            self.page = None
+            return None
+
+        # Prefer the visible watch page when several YouTube tabs are open
+        pages.sort(key=lambda p: "/watch" in p.url, reverse=True)
+        for candidate in pages:
+            try:
+                if await candidate.evaluate("document.visibilityState") == "visible":
+                    self.page = candidate
+                    break
+            except Exception:
+                continue
+        else:
+            self.page = pages[0]
+
+        logger.debug(f"Targeting YouTube tab: {self.page.url}")
+        return self.page
+
+    async def _run_script(self, script: str, arg=None):
+        """Run a script in the YouTube tab.
+
+        Returns:
+            The script's return value, or None if no tab is reachable
+        """
+        page = await self._get_youtube_page()
+        if page is None:
+            return None
+
+        started = time.perf_counter()
+        try:
+            result = await page.evaluate(script, arg)
+        except Exception as e:
+            logger.warning(f"In-page script failed: {e}")
+            self.page = None
+            return None
+
+        logger.debug(f"In-page script took {(time.perf_counter() - started) * 1000:.1f} ms")
+        return result
+
     async def _send_keyboard_shortcut(self, shortcut: str):
         """Send keyboard shortcut to active window.
-        
-        TODO: Implement cross-platform keyboard control
-        - Windows: Use pyautogui or pynput
-        - macOS: Use pyobjc
-        - Linux: Use xdotool
+
+        Fallback when no CDP connection is available. Keystrokes go to
+        whichever window has focus.
         """
         try:
             import pyautogui
-            pyautogui.hotkey(*shortcut.split("+"))
+            # pyautogui blocks while it types; keep the event loop free
+            await asyncio.to_thread(pyautogui.hotkey, *shortcut.split("+"))
             logger.debug(f"Sent keyboard shortcut: {shortcut}")
         except ImportError:
             logger.warning("pyautogui not installed")
         except Exception as e:
             logger.error(f"Failed to send shortcut: {e}")
-    
+
     async def _navigate(self, url: str):
-        """Navigate browser to URL.
-        
-        TODO: Implement proper browser control
-        - Option 1: Browser extension that accepts commands
-        - Option 2: Playwright to control browser
-        - Option 3: OS-level URL opening
+        """Navigate the YouTube tab to URL.
+
+        Falls back to opening the URL with the OS default browser when
+        no tab is reachable or the script fails.
         """
+        # The assignment returns immediately; the tab navigates on its own
+        if await self._run_script(NAVIGATE_SCRIPT, url):
+            logger.debug(f"Navigated YouTube tab to: {url}")
+            return
+
         import webbrowser
-        webbrowser.open(url)
+        await asyncio.to_thread(webbrowser.open, url)
         logger.debug(f"Opened URL: {url}")
-    
-    async def _click_next_button(self):
-        """Click the next video button using browser automation."""
-        if async_playwright is None:
-            logger.warning("Playwright not installed")
-            return
-        
-        # This would require connecting to existing browser
-        # which is complex - keyboard shortcuts are simpler
-        pass
-    
+
+    async def _click_next_button(self) -> bool:
+        """Click the player's next video button in the YouTube tab."""
+        return bool(await self._run_script(SKIP_SCRIPT))
+
     async def get_current_video_info(self) -> dict | None:
         """Get info about currently playing video.
-        
+
         Returns:
-            dict with video_id, title, channel, etc.
+            dict with video_id, url, title, channel, channel_id, paused, current_time
         """
-        # TODO: Implement via browser extension or page scraping
-        return None
+        return await self._run_script(VIDEO_INFO_SCRIPT)
+
+    async def get_up_next(self, limit: int = 5) -> list[dict]:
+        """Get the autoplay / Up Next candidates of the current video."""
+        return await self._run_script(UP_NEXT_SCRIPT, limit) or []
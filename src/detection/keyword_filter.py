@@ -0,0 +1,69 @@
+"""Keyword filtering module.
+
+Matches video titles and channel names against parent blocklists.
+"""
+
+import re
+from loguru import logger
+
+
+class KeywordFilter:
+    """Fast keyword matcher for video metadata.
+
+    All keywords are compiled into one alternation pattern, so a title is
+    scanned once no matter how many keywords the parent configured.
+    """
+
+    def __init__(self, blocked_keywords: list | None = None, blocked_channels: list | None = None):
+        self.blocked_keywords = [k for k in (blocked_keywords or []) if k]
+        self.blocked_channels = [k for k in (blocked_channels or []) if k]
+        self._title_pattern = self._compile(self.blocked_keywords)
+        self._channel_pattern = self._compile(self.blocked_channels)
+        logger.debug(
+            f"KeywordFilter compiled {len(self.blocked_keywords)} title / "
+            f"{len(self.blocked_channels)} channel keywords"
+        )
+
+    @classmethod
+    def from_config(cls, analysis_config: dict) -> "KeywordFilter":
+        """Build a filter from the `analysis` config section.
+
+        Merges `keyword_filter` lists with the `custom_rules.keywords`
+        blacklist when that rule is enabled.
+        """
+        keyword_filter = analysis_config.get("keyword_filter", {})
+        keywords = list(keyword_filter.get("blocked_keywords", []))
+        channels = list(keyword_filter.get("blocked_channels", []))
+
+        custom_keywords = analysis_config.get("custom_rules", {}).get("keywords", {})
+        if custom_keywords.get("enabled"):
+            keywords.extend(custom_keywords.get("blocked_keywords", []))
+
+        # Preserve order, drop duplicates
+        return cls(list(dict.fromkeys(keywords)), list(dict.fromkeys(channels)))
+
+    @staticmethod
+    def _compile(keywords: list) -> re.Pattern | None:
+        if not keywords:
+            return None
+        # Longest first so overlapping keywords report the most specific match
+        ordered = sorted(keywords, key=len, reverse=True)
+        return re.compile("|".join(re.escape(k) for k in ordered), re.IGNORECASE)
+
+    def match(self, title: str | None, channel: str | None = None) -> str | None:
+        """Check metadata against the blocklists.
+
+        Returns:
+            Human-readable reason if blocked, otherwise None
+        """
+        if title and self._title_pattern:
+            hit = self._title_pattern.search(title)
+            if hit:
+                return f"Title contains blocked keyword: {hit.group(0)}"
+
+        if channel and self._channel_pattern:
+            hit = self._channel_pattern.search(channel)
+            if hit:
+                return f"Channel contains blocked keyword: {hit.group(0)}"
+
+        return None
@@ -0,0 +1,229 @@
+"""Up Next prefetching module.
+
+Vets autoplay / Up Next candidates before they start playing, so the
+decision is already cached when the child lands on the next video.
+"""
+
+import asyncio
+import time
+import urllib.request
+from collections import OrderedDict
+from pathlib import Path
+from loguru import logger
+
+from src.tracing import tracer
+
+
+# Reads the autoplay target and the Up Next sidebar from a YouTube watch page.
+# Written as a function expression so both Playwright (`page.evaluate(script, limit)`)
+# and Selenium (`return (script)(arguments[0])`) can call it.
+UP_NEXT_SCRIPT = """(limit) => {
+    const items = [];
+    const seen = new Set();
+    const text = (el) => (el && el.textContent || '').trim();
+    const push = (href, title, channel) => {
+        const m = href && href.match(/[?&]v=([\\w-]{11})/);
+        if (!m || seen.has(m[1])) return;
+        seen.add(m[1]);
+        items.push({video_id: m[1], title: title || '', channel: channel || ''});
+    };
+
+    // Autoplay target first: this is what plays when the current video ends
+    const next = document.querySelector('a.ytp-next-button');
+    if (next) push(next.href, next.getAttribute('data-tooltip-text') || '', '');
+
+    document.querySelectorAll('#secondary ytd-compact-video-renderer').forEach((el) => {
+        const link = el.querySelector('a#thumbnail');
+        push(link && link.href, text(el.querySelector('#video-title')),
+             text(el.querySelector('ytd-channel-name #text')));
+    });
+
+    // Newer sidebar layout
+    document.querySelectorAll('#secondary yt-lockup-view-model').forEach((el) => {
+        const link = el.querySelector('a[href*="watch?v="]');
+        push(link && link.href, text(el.querySelector('h3')),
+             text(el.querySelector('.yt-content-metadata-view-model-wiz__metadata-text, .yt-content-metadata-view-model__metadata-text')));
+    });
+
+    return items.slice(0, limit);
+}"""
+
+THUMBNAIL_URL = "https://i.ytimg.com/vi/{video_id}/hqdefault.jpg"
+# Seconds before a video whose thumbnail download or analysis failed is tried again
+THUMBNAIL_RETRY_AFTER = 300
+
+
+class UpNextPrefetcher:
+    """Vets upcoming videos in the background and caches verdicts.
+
+    Vetting is two-staged: metadata (title / channel keywords) is checked
+    immediately, then the thumbnail is sent to the content analyzer in the
+    background. Verdicts use the same format as `ContentAnalyzer.analyze`,
+    plus `video_id`, `title`, `channel`, `source` ("metadata" | "thumbnail")
+    and `final`.
+    """
+
+    def __init__(
+        self,
+        keyword_filter=None,
+        content_analyzer=None,
+        max_candidates: int = 5,
+        max_concurrent: int = 2,
+        cache_size: int = 500,
+    ):
+        self.keyword_filter = keyword_filter
+        self.content_analyzer = content_analyzer
+        self.max_candidates = max_candidates
+        self.cache_size = cache_size
+        self.thumbnail_dir = Path("captures")
+        self.thumbnail_dir.mkdir(exist_ok=True)
+
+        self._verdicts: OrderedDict[str, dict] = OrderedDict()
+        self._pending: dict[str, asyncio.Task] = {}
+        # video_id -> monotonic time of the last failed thumbnail vetting
+        self._failed: OrderedDict[str, float] = OrderedDict()
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        logger.info("UpNextPrefetcher initialized")
+
+    def get_verdict(self, video_id: str | None) -> dict | None:
+        """Return the cached verdict for a video, if it was prefetched."""
+        if not video_id:
+            return None
+        verdict = self._verdicts.get(video_id)
+        if verdict is not None:
+            self._verdicts.move_to_end(video_id)
+        return verdict
+
+    def blocked_video_ids(self) -> set[str]:
+        """IDs of cached videos whose verdict is to block."""
+        return {vid for vid, verdict in self._verdicts.items() if verdict.get("inappropriate")}
+
+    def update_keyword_filter(self, keyword_filter):
+        """Swap in a recompiled keyword filter.
+
+        Metadata verdicts are dropped and redone on the next prefetch.
+        Thumbnail verdicts cost an API call each, so they are kept unless
+        the title or channel now hits a blocked keyword.
+        """
+        self.keyword_filter = keyword_filter
+        for video_id, verdict in list(self._verdicts.items()):
+            if verdict.get("source") == "metadata":
+                del self._verdicts[video_id]
+            elif not verdict.get("inappropriate") and keyword_filter:
+                blocked = self._vet_metadata({
+                    "video_id": video_id, "title": verdict.get("title"), "channel": verdict.get("channel"),
+                })
+                if blocked["inappropriate"]:
+                    self._verdicts[video_id] = blocked
+
+    async def prefetch(self, candidates: list[dict]):
+        """Vet a list of Up Next candidates.
+
+        Metadata verdicts are cached before this returns; thumbnail analysis
+        continues in background tasks.
+
+        Args:
+            candidates: dicts with video_id, title, channel (see UP_NEXT_SCRIPT)
+        """
+        for candidate in candidates[: self.max_candidates]:
+            video_id = candidate.get("video_id")
+            if not video_id or video_id in self._pending:
+                continue
+
+            cached = self._verdicts.get(video_id)
+            if cached is not None and cached.get("final"):
+                continue
+
+            verdict = self._vet_metadata(candidate)
+            self._store(verdict)
+
+            if verdict["final"] or self._backing_off(video_id):
+                continue
+
+            task = asyncio.create_task(self._vet_thumbnail(candidate))
+            self._pending[video_id] = task
+            task.add_done_callback(lambda _, vid=video_id: self._pending.pop(vid, None))
+
+    def _vet_metadata(self, candidate: dict) -> dict:
+        """Cheap, synchronous keyword check on title and channel."""
+        reason = None
+        if self.keyword_filter:
+            reason = self.keyword_filter.match(candidate.get("title"), candidate.get("channel"))
+
+        blocked = reason is not None
+        return {
+            "video_id": candidate["video_id"],
+            "title": candidate.get("title", ""),
+            "channel": candidate.get("channel", ""),
+            "inappropriate": blocked,
+            "reason": reason or "Metadata check passed",
+            "categories": ["keyword"] if blocked else [],
+            "severity": "high" if blocked else "none",
+            "confidence": 1.0 if blocked else 0.5,
+            "recommendation": "block" if blocked else "allow",
+            "source": "metadata",
+            # Nothing more to learn once metadata already blocks, or without an analyzer
+            "final": blocked or self.content_analyzer is None,
+        }
+
+    async def _vet_thumbnail(self, candidate: dict):
+        """Download the thumbnail and run it through the content analyzer."""
+        video_id = candidate["video_id"]
+        path = self.thumbnail_dir / f"thumb_{video_id}.jpg"
+
+        trace = tracer.begin("prefetch", video_id=video_id)
+        async with self._semaphore:
+            try:
+                with tracer.activate(trace):
+                    with tracer.span("thumbnail_download"):
+                        await asyncio.to_thread(
+                            urllib.request.urlretrieve, THUMBNAIL_URL.format(video_id=video_id), path
+                        )
+                    analysis = await self.content_analyzer.analyze({"frames": [str(path)]})
+            except BaseException as e:
+                tracer.end(trace, error=type(e).__name__)
+                if not isinstance(e, Exception):
+                    raise
+                logger.warning(
+                    f"Thumbnail prefetch failed for {video_id}: {e} (retrying in {THUMBNAIL_RETRY_AFTER}s)"
+                )
+                self._record_failure(video_id)
+                return
+            finally:
+                path.unlink(missing_ok=True)
+
+        tracer.end(trace, inappropriate=analysis.get("inappropriate", False))
+        self._failed.pop(video_id, None)
+        self._store({
+            **analysis,
+            "video_id": video_id,
+            "title": candidate.get("title", ""),
+            "channel": candidate.get("channel", ""),
+            "source": "thumbnail",
+            "final": True,
+            "trace_id": trace.trace_id if trace else None,
+        })
+        logger.debug(f"Prefetched {video_id}: {analysis.get('recommendation')}")
+
+    def _backing_off(self, video_id: str) -> bool:
+        """Whether thumbnail vetting failed for this video too recently to retry."""
+        failed_at = self._failed.get(video_id)
+        return failed_at is not None and time.monotonic() - failed_at < THUMBNAIL_RETRY_AFTER
+
+    def _record_failure(self, video_id: str):
+        self._failed[video_id] = time.monotonic()
+        self._failed.move_to_end(video_id)
+        while len(self._failed) > self.cache_size:
+            self._failed.popitem(last=False)
+
+    def _store(self, verdict: dict):
+        self._verdicts[verdict["video_id"]] = verdict
+        self._verdicts.move_to_end(verdict["video_id"])
+        while len(self._verdicts) > self.cache_size:
+            self._verdicts.popitem(last=False)
+
+    async def close(self):
+        """Cancel in-flight thumbnail analysis."""
+        for task in list(self._pending.values()):
+            task.cancel()
+        await asyncio.gather(*self._pending.values(), return_exceptions=True)
@@ -19,6 +19,45 @@ try:
 except ImportError:
     mss = None
 
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+BROWSER_SUFFIXES = (" - Google Chrome", " - Mozilla Firefox", " - Microsoft Edge", " - Brave", " - Opera")
+
+
+def read_window_title() -> dict | None:
+    """Find a YouTube window and split its title.
+
+    Window titles look like "Video title - Channel - YouTube - Google Chrome".
+
+    Returns:
+        dict with title, channel (may be None), full_title; None if no
+        YouTube video window is open
+    """
+    import pygetwindow as gw
+
+    for title in gw.getAllTitles():
+        if "youtube" not in title.lower() or not title.strip():
+            continue
+
+        clean = title
+        for suffix in BROWSER_SUFFIXES:
+            clean = clean.replace(suffix, "")
+        clean = clean.replace(" - YouTube", "").strip()
+
+        # A bare "YouTube" is the home page, not a video
+        if clean and clean.lower() != "youtube":
+            parts = clean.split(" - ")
+            return {
+                "title": parts[0].strip(),
+                "channel": parts[1].strip() if len(parts) >= 2 else None,
+                "full_title": clean,
+            }
+    return None
+
 
 class YouTubeDetector:
     """Detects YouTube activity and captures content."""
@@ -30,6 +69,10 @@ class YouTubeDetector:
         self.last_capture = None
         self.capture_dir = Path("captures")
         self.capture_dir.mkdir(exist_ok=True)
+        # Lowered by the power governor to make clips cheaper
+        self.capture_scale = 1.0
+        self.max_frames = 5
+        self.png_level = 6
         logger.info("YouTubeDetector initialized")
     
     async def is_youtube_active(self) -> bool:
@@ -81,17 +124,14 @@ class YouTubeDetector:
         frames = []
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         
-        with mss.mss() as sct:
-            # Capture frames over duration
-            for i in range(min(duration, 5)):  # Max 5 frames
-                screenshot = sct.grab(sct.monitors[1])  # Primary monitor
-                
-                # Save frame
-                frame_path = self.capture_dir / f"frame_{timestamp}_{i}.png"
-                mss.tools.to_png(screenshot.rgb, screenshot.size, output=str(frame_path))
-                frames.append(str(frame_path))
-                
-                await asyncio.sleep(1)
+        # Capture frames over duration; grabbing and encoding run in a
+        # thread, so other stages keep running while a clip is captured
+        for i in range(min(duration, self.max_frames)):
+            frame_path = self.capture_dir / f"frame_{timestamp}_{i}.png"
+            await asyncio.to_thread(self._grab_frame, frame_path)
+            frames.append(str(frame_path))
+            
+            await asyncio.sleep(1)
         
         self.last_capture = {
             "frames": frames,
@@ -102,6 +142,23 @@ class YouTubeDetector:
         logger.debug(f"Captured {len(frames)} frames")
         return self.last_capture
     
+    def _grab_frame(self, path: Path):
+        """Grab the primary monitor and save it (worker thread)."""
+        # mss handles belong to the thread that opened them
+        with mss.mss() as sct:
+            screenshot = sct.grab(sct.monitors[1])
+        self._save_frame(screenshot, path)
+    
+    def _save_frame(self, screenshot, path: Path):
+        """Save a grabbed frame at `capture_scale` (full size without Pillow)."""
+        if self.capture_scale >= 1.0 or Image is None:
+            mss.tools.to_png(screenshot.rgb, screenshot.size, level=self.png_level, output=str(path))
+            return
+        
+        image = Image.frombytes("RGB", screenshot.size, screenshot.rgb)
+        size = (max(1, int(image.width * self.capture_scale)), max(1, int(image.height * self.capture_scale)))
+        image.resize(size, Image.BILINEAR).save(path, compress_level=self.png_level)
+    
     async def cleanup_captures(self):
         """Delete old capture files."""
         for file in self.capture_dir.glob("frame_*.png"):
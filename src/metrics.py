@@ -0,0 +1,334 @@
+"""Latency metrics for KidGuard.
+
+Collects per-stage timings and counters in-process and serves them in
+the Prometheus text format on `/metrics`. Instrumented code uses the
+module-level `metrics` registry, so nothing has to be passed around:
+
+    with metrics.timer("identify"):
+        viewer = await face_recognizer.identify_viewer()
+"""
+
+import asyncio
+import bisect
+import contextlib
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from loguru import logger
+
+from src.tracing import tracer
+
+# Seconds; covers sub-millisecond checks up to slow API round trips
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value))
+
+
+class Histogram:
+    """Cumulative-bucket histogram, one series per label set."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._series: dict[tuple, list] = {}  # labels -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0.0, 0])
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                labels = dict(key)
+                cumulative = 0
+                for bound, n in zip(self.buckets, counts):
+                    cumulative += n
+                    lines.append(
+                        f"{self.name}_bucket{_format_labels({**labels, 'le': _format_value(bound)})} {cumulative}"
+                    )
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class Summary:
+    """Quantiles over the most recent `window` observations."""
+
+    kind = "summary"
+
+    def __init__(self, name: str, help_text: str, quantiles: tuple = (0.5, 0.95, 0.99), window: int = 1000):
+        self.name = name
+        self.help = help_text
+        self.quantiles = quantiles
+        self._values = deque(maxlen=window)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._values.append(value)
+            self._sum += value
+            self._count += 1
+
+    def quantile(self, q: float) -> float | None:
+        with self._lock:
+            ordered = sorted(self._values)
+        if not ordered:
+            return None
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def render(self) -> list[str]:
+        lines = []
+        for q in self.quantiles:
+            value = self.quantile(q)
+            lines.append(
+                f"{self.name}{_format_labels({'quantile': q})} "
+                f"{'NaN' if value is None else _format_value(value)}"
+            )
+        with self._lock:
+            lines.append(f"{self.name}_sum {_format_value(self._sum)}")
+            lines.append(f"{self.name}_count {self._count}")
+        return lines
+
+
+class Counter:
+    """Monotonic counter, one series per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._values: dict[tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        with self._lock:
+            return [
+                f"{self.name}{_format_labels(dict(key))} {_format_value(value)}"
+                for key, value in sorted(self._values.items())
+            ]
+
+
+class Gauge:
+    """Last value set (e.g. the current power level)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help = help_text
+        self._value = 0.0
+
+    def set(self, value: float):
+        self._value = value
+
+    def render(self) -> list[str]:
+        return [f"{self.name} {_format_value(self._value)}"]
+
+
+class RateGauge:
+    """Events in the trailing window (e.g. API calls in the last hour)."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, window: float = 3600.0):
+        self.name = name
+        self.help = help_text
+        self.window = window
+        self._events = deque()
+        self._lock = threading.Lock()
+
+    def mark(self, now: float | None = None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._events.append(now)
+            self._trim(now)
+
+    def _trim(self, now: float):
+        while self._events and now - self._events[0] > self.window:
+            self._events.popleft()
+
+    def value(self) -> int:
+        with self._lock:
+            self._trim(time.monotonic())
+            return len(self._events)
+
+    def render(self) -> list[str]:
+        return [f"{self.name} {self.value()}"]
+
+
+class MetricsRegistry:
+    """The metrics KidGuard exports."""
+
+    def __init__(self):
+        self.stage_seconds = Histogram(
+            "kidguard_stage_duration_seconds",
+            "Time spent per pipeline stage",
+        )
+        self.time_to_intervention = Summary(
+            "kidguard_time_to_intervention_seconds",
+            "From the start of a check to the completed intervention",
+        )
+        self.api_calls = Counter(
+            "kidguard_api_calls_total",
+            "Claude API calls by result",
+        )
+        self.api_calls_per_hour = RateGauge(
+            "kidguard_api_calls_per_hour",
+            "Claude API calls in the last hour",
+        )
+        self.events = Counter(
+            "kidguard_events_total",
+            "Checks, detections, actions and notifications",
+        )
+        self.cpu_percent = Gauge(
+            "kidguard_cpu_percent",
+            "CPU used by KidGuard and its workers, in percent of all cores",
+        )
+        self.power_level = Gauge(
+            "kidguard_power_level",
+            "Throttling level of the power governor (0 = full rate)",
+        )
+
+    def reset(self):
+        """Start from empty metrics (e.g. between benchmark runs)."""
+        self.__init__()
+
+    def all(self) -> list:
+        return [
+            self.stage_seconds,
+            self.time_to_intervention,
+            self.api_calls,
+            self.api_calls_per_hour,
+            self.events,
+            self.cpu_percent,
+            self.power_level,
+        ]
+
+    def observe_stage(self, stage: str, seconds: float):
+        self.stage_seconds.observe(seconds, stage=stage)
+
+    @contextlib.contextmanager
+    def timer(self, stage: str):
+        """Time a block with the monotonic clock.
+
+        Failed attempts count, cancelled ones (e.g. a speculative capture
+        that was dropped) don't. The block is also a span of the decision
+        being traced, if any.
+        """
+        start = time.perf_counter()
+        cancelled = False
+        try:
+            with tracer.span(stage):
+                yield
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+        finally:
+            if not cancelled:
+                self.observe_stage(stage, time.perf_counter() - start)
+
+    async def timed(self, stage: str, awaitable):
+        """Await something under `timer(stage)`."""
+        with self.timer(stage):
+            return await awaitable
+
+    def event(self, name: str):
+        self.events.inc(event=name)
+
+    def api_call(self, ok: bool = True):
+        self.api_calls.inc(result="ok" if ok else "error")
+        self.api_calls_per_hour.mark()
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.all():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+
+class MetricsServer:
+    """Serves `/metrics` from a background thread."""
+
+    def __init__(self, registry: MetricsRegistry = metrics, host: str = "127.0.0.1", port: int = 9108):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        registry = self.registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            logger.error(f"Could not start metrics server on {self.host}:{self.port}: {e}")
+            return
+
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, name="metrics-server", daemon=True)
+        self._thread.start()
+        logger.info(f"Metrics at http://{self.host}:{self.port}/metrics")
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            self._thread = None
@@ -0,0 +1 @@
+# Live monitor engine (shared by the live_monitor* scripts)
@@ -0,0 +1,176 @@
+"""Deciders for the monitor engine.
+
+Deciders run in order on every check. Each sees the suggestion of the
+ones before it and returns its own `Decision` (or None for no opinion);
+the last decision wins. Automatic deciders only suggest, so a human
+decider placed last gets the final say.
+"""
+
+from dataclasses import dataclass
+
+from src.monitor.services import ACTIONS
+from src.utils.log_sink import console
+
+STOP_COMMANDS = ("stop", "quit", "exit")
+
+
+@dataclass
+class Decision:
+    """What to do about the current video."""
+
+    action: str | None           # one of ACTIONS, or None when the video is fine
+    reason: str = ""
+    decider: str = ""
+    stop: bool = False           # stop monitoring
+
+
+class Decider:
+    """Base class."""
+
+    name = "decider"
+    # Waits for a person; the engine closes the check's trace before it runs
+    interactive = False
+
+    async def start(self, engine):
+        """Called once by the engine before the first check."""
+
+    async def decide(self, check, suggestion: Decision | None) -> Decision | None:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class KeywordDecider(Decider):
+    """Blocks on title / channel keywords (free, no API call)."""
+
+    name = "keyword"
+
+    def __init__(self, keyword_filter, action: str = "close"):
+        self.keyword_filter = keyword_filter
+        self.action = action
+
+    async def decide(self, check, suggestion):
+        event = check.event
+        reason = self.keyword_filter.match(event.title, event.channel)
+        if reason is None:
+            return Decision(None, "關鍵字檢查通過", self.name)
+        return Decision(self.action, reason, self.name)
+
+
+class PrefetchDecider(Decider):
+    """Uses the Up Next prefetcher's cached verdict, if the video was vetted.
+
+    A title-only verdict that is still waiting for the thumbnail analysis
+    is not reported as safe.
+    """
+
+    name = "prefetch"
+
+    def __init__(self, prefetcher, action: str = "redirect"):
+        self.prefetcher = prefetcher
+        self.action = action
+
+    async def decide(self, check, suggestion):
+        verdict = self.prefetcher.get_verdict(check.event.video_id)
+        if verdict is None:
+            return None
+        if not verdict["inappropriate"] and not verdict.get("final"):
+            # Only the title was checked so far; the thumbnail is still being analyzed
+            return None
+
+        source = "縮圖分析" if verdict["source"] == "thumbnail" else "標題關鍵字"
+        check.annotate(prefetched=True, prefetch_trace_id=verdict.get("trace_id"))
+        if verdict["inappropriate"]:
+            return Decision(self.action, f"預審（{source}）: {verdict['reason']}", self.name)
+        return Decision(None, f"預審（{source}）: 安全", self.name)
+
+
+class AIDecider(Decider):
+    """Sends the screenshot to the Claude content analyzer.
+
+    Skipped when an earlier decider already wants to act, so a keyword
+    hit never costs an API call.
+    """
+
+    name = "ai"
+
+    def __init__(self, content_analyzer, action: str = "redirect"):
+        self.content_analyzer = content_analyzer
+        self.action = action
+
+    async def decide(self, check, suggestion):
+        if suggestion and suggestion.action:
+            return None
+
+        screenshot = await check.screenshot()
+        if screenshot is None:
+            return None
+
+        analysis = await self.content_analyzer.analyze({"frames": [str(screenshot)]})
+        if analysis.get("inappropriate"):
+            return Decision(self.action, analysis.get("reason", ""), self.name)
+        return Decision(None, analysis.get("reason", "內容安全"), self.name)
+
+
+class HumanDecider(Decider):
+    """Asks a person through a `DecisionQueue`.
+
+    `always` asks on every check (the person relays Claude's reading of
+    the screenshot); otherwise only to confirm a suggested action, where
+    'y' accepts it and 'n' ignores it. The engine keeps monitoring while
+    the question is open.
+    """
+
+    name = "human"
+    interactive = True
+
+    def __init__(self, always: bool = True, queue=None):
+        if queue is None:
+            from src.monitor.decisions import DecisionQueue
+            queue = DecisionQueue()
+        self.always = always
+        self.queue = queue
+
+    async def start(self, engine):
+        # 'stop' stops the engine even when no question is open
+        self.queue.on_stop = engine.stop
+        await self.queue.start()
+
+    async def close(self):
+        await self.queue.close()
+
+    async def decide(self, check, suggestion):
+        suggested = suggestion.action if suggestion else None
+        if not self.always and not suggested:
+            return None
+
+        if self.always:
+            await check.screenshot()
+        pending = self.queue.submit(check, suggestion)
+
+        console.print(f"❓ #{pending.id} 等待判斷: {check.event.title or '（無標題）'}")
+        if self.always and pending.screenshot:
+            console.print("   🤖 請將截圖給 Claude 分析，再輸入建議的動作")
+        if suggested:
+            console.print(f"   建議動作: {suggested}（'y' 執行，'n' 忽略）")
+        console.print(
+            f"   輸入 {' / '.join(ACTIONS)} / ok / stop 回覆最早的項目，或 '#{pending.id} <指令>'；"
+            f"{self.queue.timeout:.0f} 秒內無回覆則採用預設: {suggested or 'ok'}"
+        )
+        return await self.queue.wait(pending)
+
+
+def parse_command(command: str, suggested: str | None = None, decider: str = "human") -> Decision:
+    """Turn a typed command into a decision ('y' accepts `suggested`)."""
+    if command in STOP_COMMANDS:
+        return Decision(None, "使用者停止監控", decider, stop=True)
+    if command == "y" and suggested:
+        return Decision(suggested, "使用者確認", decider)
+    if command in ACTIONS:
+        return Decision(command, "使用者指定", decider)
+    if command in ("ok", "n", ""):
+        console.print("✅ 內容安全，繼續監控...")
+    else:
+        console.print(f"⚠️  未知指令: {command}")
+    return Decision(None, "使用者判定安全", decider)
@@ -0,0 +1,250 @@
+"""Human decision queue for the live monitors.
+
+Checks that need a person are submitted here instead of blocking on
+`input()`. Answers come from the terminal, the web UI or any other local
+client of the decision socket, while the engine keeps monitoring. Several
+videos can be waiting at once; one nobody answers in time falls back to
+the policy default (the automatic deciders' suggestion, else no action).
+
+Socket protocol: one JSON object per line, e.g.
+
+    {"op": "list"}                               -> {"ok": true, "pending": [...]}
+    {"op": "answer", "id": 3, "command": "close"} -> {"ok": true}
+"""
+
+import asyncio
+import json
+import socket
+import time
+from dataclasses import dataclass, field
+from loguru import logger
+
+from src.monitor.deciders import STOP_COMMANDS, Decision, parse_command
+from src.monitor.services import ACTIONS, read_line
+from src.utils.log_sink import console
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# What remote clients may answer; stopping the monitor is terminal-only
+ANSWERS = (*ACTIONS, "ok", "y", "n")
+
+
+@dataclass
+class PendingDecision:
+    """A check waiting for a person."""
+
+    id: int
+    key: str | None
+    title: str | None
+    channel: str | None
+    suggestion: Decision | None
+    screenshot: str | None
+    deadline: float
+    created: float = field(default_factory=time.time)
+    future: asyncio.Future | None = field(default=None, repr=False)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "title": self.title,
+            "channel": self.channel,
+            "suggested_action": self.suggestion.action if self.suggestion else None,
+            "reason": self.suggestion.reason if self.suggestion else None,
+            "screenshot": self.screenshot,
+            "created": self.created,
+            "expires_in": max(0.0, round(self.deadline - time.time(), 1)),
+        }
+
+
+class DecisionQueue:
+    """Pending human decisions and the channels that answer them.
+
+    Args:
+        timeout: seconds before the policy default is applied
+        terminal: read answers from stdin
+        host, port: decision socket address (port None: no socket)
+    """
+
+    def __init__(self, timeout: float = 60.0, terminal: bool = True,
+                 host: str = DEFAULT_HOST, port: int | None = DEFAULT_PORT):
+        self.timeout = timeout
+        self.terminal = terminal
+        self.host = host
+        self.port = port
+
+        # Called for 'stop' / 'quit' / 'exit' typed in the terminal, whether
+        # or not anything is pending
+        self.on_stop = None
+
+        self._pending: dict[int, PendingDecision] = {}
+        self._next_id = 1
+        self._server = None
+        self._terminal_task = None
+
+    @classmethod
+    def from_config(cls, config: dict, terminal: bool = True) -> "DecisionQueue":
+        """Build from the `live_monitor` config section."""
+        section = config.get("live_monitor", {})
+        return cls(
+            timeout=section.get("decision_timeout", 60),
+            terminal=terminal,
+            host=section.get("decision_host", DEFAULT_HOST),
+            port=section.get("decision_port", DEFAULT_PORT),
+        )
+
+    async def start(self):
+        """Open the answer channels."""
+        if self.port:
+            try:
+                self._server = await asyncio.start_server(self._serve_client, self.host, self.port)
+                logger.info(f"Decision socket on {self.host}:{self.port}")
+            except OSError as e:
+                logger.error(f"Could not open decision socket on {self.host}:{self.port}: {e}")
+        if self.terminal:
+            self._terminal_task = asyncio.create_task(self._read_terminal())
+
+    async def close(self):
+        """Close the channels; unanswered decisions are cancelled."""
+        if self._terminal_task:
+            self._terminal_task.cancel()
+            await asyncio.gather(self._terminal_task, return_exceptions=True)
+            self._terminal_task = None
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for pending in list(self._pending.values()):
+            pending.future.cancel()
+        self._pending.clear()
+
+    def submit(self, check, suggestion: Decision | None) -> PendingDecision:
+        """Queue a check for a person; answer with `wait`."""
+        loop = asyncio.get_running_loop()
+        event = check.event
+        screenshot = check.screenshot_path
+        pending = PendingDecision(
+            id=self._next_id,
+            key=event.key,
+            title=event.title,
+            channel=event.channel,
+            suggestion=suggestion,
+            screenshot=str(screenshot.absolute()) if screenshot else None,
+            deadline=time.time() + self.timeout,
+            future=loop.create_future(),
+        )
+        self._next_id += 1
+        self._pending[pending.id] = pending
+        loop.call_later(self.timeout, self._expire, pending)
+        return pending
+
+    async def wait(self, pending: PendingDecision) -> Decision:
+        try:
+            return await pending.future
+        finally:
+            self._pending.pop(pending.id, None)
+
+    def answer(self, decision_id: int | None, command: str, via: str = "terminal") -> bool:
+        """Resolve a pending decision (the oldest one if `decision_id` is None).
+
+        A stop command from the terminal stops monitoring instead (see
+        `on_stop`); other channels can't stop it.
+
+        Returns:
+            False if there is no such pending decision, or the command is
+            not allowed for `via`
+        """
+        command = command.strip().lower()
+        if command in STOP_COMMANDS:
+            if via != "terminal" or self.on_stop is None:
+                return False
+            console.print("🛑 停止監控")
+            self.on_stop()
+            return True
+
+        if decision_id is None:
+            decision_id = min(self._pending, default=None)
+        pending = self._pending.get(int(decision_id)) if decision_id is not None else None
+        if pending is None or pending.future.done():
+            return False
+
+        suggested = pending.suggestion.action if pending.suggestion else None
+        decision = parse_command(command, suggested, "human")
+        decision.reason = f"{decision.reason}（{via}）"
+        pending.future.set_result(decision)
+        return True
+
+    def pending(self) -> list[dict]:
+        """Waiting decisions, oldest first."""
+        return [p.to_dict() for p in sorted(self._pending.values(), key=lambda p: p.id)]
+
+    def _expire(self, pending: PendingDecision):
+        if pending.future.done():
+            return
+        if pending.suggestion and pending.suggestion.action:
+            decision = Decision(pending.suggestion.action, "逾時，採用建議動作", "timeout")
+        else:
+            decision = Decision(None, "逾時，未執行動作", "timeout")
+        console.print(f"⌛ #{pending.id} 無人回覆，採用預設: {decision.action or 'ok'}")
+        pending.future.set_result(decision)
+
+    async def _read_terminal(self):
+        """'<command>' answers the oldest decision, '#<id> <command>' a given one."""
+        while True:
+            try:
+                line = (await read_line("")).strip()
+            except EOFError:
+                # Non-interactive run: decisions come from the socket or time out
+                return
+            if not line:
+                continue
+            if line == "list":
+                for item in self.pending():
+                    console.print(f"   #{item['id']} {item['title']} (建議: {item['suggested_action'] or 'ok'})")
+                continue
+
+            decision_id, command = None, line
+            first, _, rest = line.partition(" ")
+            if first.lstrip("#").isdigit() and rest:
+                decision_id, command = int(first.lstrip("#")), rest
+            if not self.answer(decision_id, command):
+                console.print("⚠️  沒有這個待決項目")
+
+    async def _serve_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                    if request.get("op") == "list":
+                        response = {"ok": True, "pending": self.pending()}
+                    elif request.get("op") == "answer":
+                        command = str(request.get("command", ""))
+                        via = str(request.get("via", "socket"))
+                        if via == "terminal":
+                            # Only the monitor's own terminal may stop it
+                            via = "socket"
+                        ok = self.answer(request.get("id"), command, via=via)
+                        response = {"ok": True} if ok else {
+                            "ok": False, "error": "no such pending decision, or command not allowed"
+                        }
+                    else:
+                        response = {"ok": False, "error": "unknown op"}
+                except (ValueError, AttributeError, TypeError) as e:
+                    response = {"ok": False, "error": f"bad request: {e}"}
+                writer.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def send_request(request: dict, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = 2.0) -> dict:
+    """Blocking client for the decision socket (used by the web UI).
+
+    Raises:
+        OSError: no monitor is listening
+    """
+    with socket.create_connection((host, port), timeout=timeout) as conn:
+        conn.sendall(json.dumps(request).encode("utf-8") + b"\n")
+        with conn.makefile("rb") as reply:
+            return json.loads(reply.readline())
@@ -0,0 +1,255 @@
+"""Monitor engine.
+
+One async loop behind every live monitor script: a source reports what
+is playing, a chain of deciders judges each new video, and the shared
+capture and action services do the rest. Questions for a person go to a
+`DecisionQueue` and are answered in the background, so polling and
+capture carry on while several videos wait for an answer.
+"""
+
+import asyncio
+from pathlib import Path
+
+from src.metrics import metrics
+from src.monitor.deciders import Decision, parse_command
+from src.monitor.services import ActionService, CaptureService, read_screenshot_text
+from src.tracing import tracer
+from src.utils.log_sink import console
+
+
+class MonitorCheck:
+    """One new video going through the deciders.
+
+    The screenshot is taken at most once, the first time a decider (or
+    the engine) asks for it.
+    """
+
+    def __init__(self, event, capture: CaptureService | None):
+        self.event = event
+        self.trace = None
+        self.trace_args: dict = {}
+        self._capture = capture
+        self._screenshot = None
+        self._captured = False
+
+    async def screenshot(self) -> Path | None:
+        if not self._captured and self._capture is not None:
+            self._captured = True
+            with tracer.activate(self.trace), tracer.span("capture"):
+                self._screenshot = await self._capture.capture()
+        return self._screenshot
+
+    @property
+    def screenshot_path(self) -> Path | None:
+        """The screenshot if one was taken (never captures)."""
+        return self._screenshot
+
+    def annotate(self, **args):
+        """Extra arguments for the check's trace."""
+        self.trace_args.update(args)
+
+
+class MonitorEngine:
+    """Polls a source and acts on every video switch.
+
+    Args:
+        source: a `VideoSource`
+        deciders: `Decider`s, run in order
+        capture: screenshot service (None: never capture)
+        actions: action service (None: keyboard actions, 10 s cooldown)
+        capture_always: screenshot every new video, not only when a
+            decider asks for one or suggests an action
+        ocr: read title / channel from the screenshot as well
+    """
+
+    def __init__(self, source, deciders: list, capture: CaptureService | None = None,
+                 actions: ActionService | None = None, capture_always: bool = True, ocr: bool = False):
+        self.source = source
+        self.deciders = deciders
+        self.capture = capture
+        self.actions = actions or ActionService()
+        self.capture_always = capture_always
+        self.ocr = ocr
+
+        self.last_key = None
+        self.youtube_open = False
+        self._stopped = asyncio.Event()
+        # Checks waiting for a person
+        self._waiting: set[asyncio.Task] = set()
+
+    def stop(self):
+        self._stopped.set()
+
+    async def run(self):
+        """Monitor until `stop()` or a 'stop' command."""
+        if not await self.source.start():
+            return
+
+        await self.actions.start()
+        for decider in self.deciders:
+            await decider.start(self)
+        try:
+            while not self._stopped.is_set():
+                event = await self.source.poll()
+                await self._handle(event)
+
+                if self.source.interval and not self._stopped.is_set():
+                    try:
+                        await asyncio.wait_for(self._stopped.wait(), self.source.interval)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            for task in self._waiting:
+                task.cancel()
+            await asyncio.gather(*self._waiting, return_exceptions=True)
+            for decider in self.deciders:
+                await decider.close()
+            await self.actions.stop()
+            await self.source.close()
+            tracer.close()
+            # Let the caller's summary print below everything that was queued
+            await asyncio.to_thread(console.flush)
+
+    async def _handle(self, event):
+        if event is None:
+            if self.youtube_open:
+                console.print("✓ YouTube 已關閉，繼續待機...")
+            self.youtube_open = False
+            self.last_key = None
+            return
+
+        if event.command:
+            self._apply(parse_command(event.command), event)
+            return
+
+        if self.source.watches_presence and not self.youtube_open:
+            console.print("=" * 70)
+            console.print("⚠️  偵測到 YouTube！")
+            console.print("=" * 70)
+        self.youtube_open = True
+
+        if event.forced or event.key != self.last_key:
+            await self._check(event)
+
+    async def _check(self, event):
+        switched = event.key is not None and event.key != self.last_key
+        if switched:
+            console.print()
+            console.print("=" * 70)
+            if self.last_key is not None:
+                console.print("🎬 偵測到影片跳轉！")
+                console.print(f"   上一部: {self.last_key[:60]}")
+                console.print(f"   新影片: {event.key[:60]}")
+            else:
+                console.print("🎬 偵測到新影片")
+            console.print("=" * 70)
+            metrics.events.inc(event="video_switch", source=self.source.name)
+        if event.key is not None:
+            self.last_key = event.key
+
+        check = MonitorCheck(event, self.capture)
+        check.trace = tracer.begin("video_switch", video_id=event.video_id, title=event.title)
+        if self.capture_always:
+            await check.screenshot()
+        await self._print_info(check)
+
+        suggestion = None
+        remaining = []
+        try:
+            for i, decider in enumerate(self.deciders):
+                if decider.interactive:
+                    remaining = self.deciders[i:]
+                    break
+                with tracer.activate(check.trace), tracer.span(f"decide:{decider.name}"):
+                    decision = await decider.decide(check, suggestion)
+                if decision is not None:
+                    self._print_decision(decision)
+                    suggestion = decision
+        finally:
+            # Time spent waiting for a person is not part of the decision
+            self._end_trace(check, suggestion)
+
+        if remaining:
+            # Keep polling while the question is open; the answer is applied later
+            task = asyncio.create_task(self._decide_later(check, suggestion, remaining))
+            self._waiting.add(task)
+            task.add_done_callback(self._waiting.discard)
+        else:
+            await self._finish(check, suggestion)
+
+        console.print()
+        console.print("⏳ 繼續監控影片跳轉...")
+        console.print("-" * 70)
+        console.print()
+
+    async def _decide_later(self, check: MonitorCheck, suggestion: Decision | None, deciders: list):
+        for decider in deciders:
+            decision = await decider.decide(check, suggestion)
+            if decision is not None:
+                suggestion = decision
+
+        if suggestion and suggestion.action and check.event.key != self.last_key:
+            # The child already moved on; acting now would hit the wrong video
+            console.print(f"⏭️  「{check.event.title}」已不在播放，略過 {suggestion.action}")
+            return
+        await self._finish(check, suggestion)
+
+    async def _finish(self, check: MonitorCheck, decision: Decision | None):
+        if decision and decision.action and not self.capture_always:
+            # Keep a screenshot as a record of what was acted on
+            await check.screenshot()
+        self._apply(decision, check.event)
+
+    def _end_trace(self, check: MonitorCheck, decision: Decision | None):
+        if check.trace is None:
+            return
+        tracer.end(
+            check.trace,
+            action=decision.action if decision else None,
+            decider=decision.decider if decision else None,
+            **check.trace_args
+        )
+        check.trace = None
+
+    async def _print_info(self, check: MonitorCheck):
+        event = check.event
+        ocr = None
+        if self.ocr:
+            screenshot = await check.screenshot()
+            ocr = await read_screenshot_text(screenshot) if screenshot else None
+
+        title = event.title or (ocr and ocr["title"])
+        channel = event.channel or (ocr and ocr["channel"])
+        if check.screenshot_path:
+            console.print(f"📋 截圖已保存: {check.screenshot_path.absolute()}")
+        if not (title or channel or event.url):
+            return
+        console.print()
+        console.print("📺 影片資訊:")
+        if title:
+            console.print(f"   標題: {title}")
+        if channel:
+            console.print(f"   頻道: {channel}")
+        if event.url:
+            console.print(f"   URL: {event.url}")
+        console.print()
+
+    @staticmethod
+    def _print_decision(decision: Decision):
+        if decision.action:
+            console.print(f"🚨 [{decision.decider}] {decision.reason}")
+            console.print(f"   建議動作: {decision.action}")
+        else:
+            console.print(f"✅ [{decision.decider}] {decision.reason}")
+
+    def _apply(self, decision: Decision | None, event):
+        if decision is None:
+            return
+        if decision.stop:
+            console.print("🛑 停止監控")
+            self.stop()
+        elif decision.action:
+            self.actions.execute(decision.action, video_key=event.key)
+            # The tab moves on, so the next title counts as a new video
+            if decision.action in ("close", "redirect"):
+                self.last_key = None
@@ -0,0 +1,239 @@
+"""Shared services for the live monitors.
+
+Screen capture, console input and intervention actions, written once for
+every source and decider. Blocking work (mss, Tesseract, pyautogui,
+tkinter) runs off the event loop, and console output goes through the
+queued `console` so a slow terminal never holds up a check.
+"""
+
+import asyncio
+import re
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from src.control.action_dispatcher import ActionDispatcher
+from src.utils.log_sink import console
+
+SAFE_URL = "https://www.youtube.com/c/Cocomelon"
+ACTIONS = ("close", "redirect", "pause", "warn")
+WARNING_TITLE = "KidGuard 內容警告"
+WARNING_MESSAGE = "偵測到不適當的內容！\n\n此影片可能不適合兒童觀看。"
+
+
+async def read_line(prompt: str) -> str:
+    """`input()` without blocking the event loop.
+
+    Runs on a daemon thread rather than the default executor, so Ctrl+C
+    does not wait for a pending prompt to be answered.
+
+    Raises:
+        EOFError: stdin is closed (non-interactive run)
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.create_future()
+
+    def resolve(result=None, error=None):
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def worker():
+        try:
+            # Queued output goes first, so the prompt is not printed above it
+            console.flush()
+            line = input(prompt)
+        except BaseException as e:
+            loop.call_soon_threadsafe(resolve, None, e)
+        else:
+            loop.call_soon_threadsafe(resolve, line)
+
+    threading.Thread(target=worker, name="console-input", daemon=True).start()
+    return await future
+
+
+class CaptureService:
+    """Takes downscaled screenshots of the primary monitor.
+
+    The frame goes straight from mss into Pillow and is encoded once,
+    instead of being written as a full-size PNG and re-read to shrink it.
+    """
+
+    def __init__(self, screenshot_dir: str = "screenshots", prefix: str = "yt_capture",
+                 max_size: tuple[int, int] = (1280, 720)):
+        self.screenshot_dir = Path(screenshot_dir)
+        self.screenshot_dir.mkdir(exist_ok=True)
+        self.prefix = prefix
+        self.max_size = max_size
+        self.count = 0
+
+    async def capture(self) -> Path | None:
+        """Save a screenshot; returns its path, or None if capturing failed."""
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        path = self.screenshot_dir / f"{self.prefix}_{timestamp}_{self.count:03d}.png"
+        console.print(f"📸 擷取螢幕: {path.name}")
+
+        try:
+            await asyncio.to_thread(self._grab, path)
+        except Exception as e:
+            console.print(f"❌ 擷取失敗: {e}")
+            return None
+
+        self.count += 1
+        return path
+
+    def _grab(self, path: Path):
+        import mss
+        from PIL import Image
+
+        with mss.mss() as sct:
+            shot = sct.grab(sct.monitors[1])
+        img = Image.frombytes("RGB", shot.size, shot.rgb)
+        img.thumbnail(self.max_size, Image.Resampling.LANCZOS)
+        img.save(path, optimize=True)
+
+
+async def read_screenshot_text(path: Path) -> dict:
+    """OCR the title and channel from a screenshot (needs pytesseract).
+
+    Returns:
+        dict with title, channel (either may be None)
+    """
+    try:
+        import pytesseract  # noqa: F401
+    except ImportError:
+        console.print("   ⚠️  OCR 不可用（需要安裝 pytesseract）")
+        return {"title": None, "channel": None}
+
+    try:
+        return await asyncio.to_thread(_ocr, path)
+    except Exception as e:
+        console.print(f"   ⚠️  提取影片資訊失敗: {e}")
+        return {"title": None, "channel": None}
+
+
+def _ocr(path: Path) -> dict:
+    import pytesseract
+    from PIL import Image
+
+    img = Image.open(path)
+    width, height = img.size
+    # The title sits in the top fifth of the page, the channel just below it
+    title = pytesseract.image_to_string(img.crop((0, 0, width, int(height * 0.2))), lang="chi_tra+eng")
+    channel = pytesseract.image_to_string(
+        img.crop((0, int(height * 0.15), width, int(height * 0.3))), lang="chi_tra+eng"
+    )
+    title = re.sub(r"(YouTube|訂閱|Subscribe|分享|Share)", "", " ".join(title.split()))
+    channel = re.sub(r"(訂閱|Subscribe|已訂閱|Subscribed)", "", " ".join(channel.split()))
+    return {"title": title.strip()[:100] or None, "channel": channel.strip()[:50] or None}
+
+
+class ActionService:
+    """Runs interventions through an `ActionDispatcher`.
+
+    With a `BrowserController` the YouTube tab is driven over CDP (and the
+    controller falls back to keyboard shortcuts on its own); without one,
+    actions are keystrokes to the focused window. `redirect` goes to the
+    first safe channel from the config, or to SAFE_URL if there is none.
+    """
+
+    def __init__(self, browser=None, safe_channel_id: str | None = None, cooldown: float = 10):
+        self.browser = browser
+        self.safe_channel_id = safe_channel_id
+        self.dispatcher = ActionDispatcher(cooldown=cooldown)
+
+    async def start(self):
+        await self.dispatcher.start()
+
+    async def stop(self):
+        await self.dispatcher.stop()
+
+    def execute(self, action: str, video_key: str | None = None) -> bool:
+        """Queue an action for the current video without waiting for it.
+
+        Returns:
+            False if the action is unknown or was just run for this video
+        """
+        handler = getattr(self, f"_{action}", None) if action in ACTIONS else None
+        if handler is None:
+            console.print(f"⚠️  未知動作: {action}")
+            return False
+
+        queued = self.dispatcher.submit(action, handler, video_id=video_key)
+        if not queued:
+            console.print(f"   ⏭️  這部影片剛執行過 {action}，略過重複動作")
+        return queued
+
+    async def _close(self):
+        console.print("🚫 執行干預：關閉 YouTube 分頁...")
+        await self._keys(("hotkey", "ctrl", "w"))
+        console.print("   ✓ 已發送關閉指令")
+
+    async def _redirect(self):
+        console.print("↪️  執行干預：重導向到安全內容...")
+        if self.browser and self.safe_channel_id:
+            await self.browser.redirect_to_channel(self.safe_channel_id)
+        elif self.safe_channel_id:
+            await asyncio.to_thread(_paste_url, f"https://www.youtube.com/channel/{self.safe_channel_id}/videos")
+        else:
+            await asyncio.to_thread(_paste_url, SAFE_URL)
+        console.print("   ✓ 已重導向到安全頻道")
+
+    async def _pause(self):
+        console.print("⏸️  執行干預：暫停影片...")
+        if self.browser:
+            await self.browser.pause_video()
+        else:
+            await self._keys(("press", "space"))
+        console.print("   ✓ 已暫停影片")
+
+    async def _warn(self):
+        console.print("⚠️  執行干預：顯示警告...")
+        # Pauses the video and covers the YouTube tab in one round trip
+        if self.browser and await self.browser.show_block_overlay():
+            console.print("   ✓ 已在頁面上顯示警告並暫停影片")
+            return
+        await asyncio.to_thread(_message_box)
+        console.print("   ✓ 已顯示警告")
+
+    @staticmethod
+    async def _keys(*strokes):
+        def send():
+            import pyautogui
+            for method, *keys in strokes:
+                getattr(pyautogui, method)(*keys)
+
+        await asyncio.to_thread(send)
+
+
+def _paste_url(url: str):
+    """Type URL into the focused browser's address bar.
+
+    Blocks for the whole key sequence; run it with `asyncio.to_thread`.
+    """
+    import pyautogui
+    import pyperclip
+
+    # Ctrl+L selects the address bar, Ctrl+V pastes, Enter navigates
+    pyperclip.copy(url)
+    pyautogui.hotkey("ctrl", "l")
+    time.sleep(0.3)
+    pyautogui.hotkey("ctrl", "v")
+    time.sleep(0.3)
+    pyautogui.press("enter")
+
+
+def _message_box():
+    import tkinter as tk
+    from tkinter import messagebox
+
+    root = tk.Tk()
+    root.withdraw()
+    try:
+        messagebox.showwarning(WARNING_TITLE, WARNING_MESSAGE)
+    finally:
+        root.destroy()
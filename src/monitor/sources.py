@@ -0,0 +1,152 @@
+"""Video sources for the monitor engine.
+
+A source tells the engine what is playing. `poll()` returns a
+`VideoEvent`, or None when no YouTube video is open; the engine compares
+`VideoEvent.key` between polls to spot video switches.
+"""
+
+import asyncio
+from dataclasses import dataclass
+
+from src.detection.youtube_detector import read_window_title
+from src.monitor.services import read_line
+from src.utils.log_sink import console
+
+
+@dataclass
+class VideoEvent:
+    """What a source saw on one poll."""
+
+    key: str | None              # identifies "the same video" for this source
+    title: str | None = None
+    channel: str | None = None
+    video_id: str | None = None
+    url: str | None = None
+    forced: bool = False         # check even if the video did not change
+    command: str | None = None   # typed by the user instead of requesting a check
+
+
+class VideoSource:
+    """Base class: a poll every `interval` seconds."""
+
+    name = "source"
+    interval = 2.0
+    # Report YouTube opening and closing (not useful for on-demand sources)
+    watches_presence = True
+
+    async def start(self) -> bool:
+        """Prepare the source; False if it cannot run."""
+        return True
+
+    async def poll(self) -> VideoEvent | None:
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+
+class WindowTitleSource(VideoSource):
+    """Reads the video from the browser's window title (no OCR or CDP needed)."""
+
+    name = "window_title"
+
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+
+    async def poll(self) -> VideoEvent | None:
+        try:
+            info = await asyncio.to_thread(read_window_title)
+        except Exception as e:
+            console.print(f"   ⚠️  無法獲取視窗標題: {e}")
+            return None
+
+        if info is None:
+            return None
+        return VideoEvent(key=info["full_title"], title=info["title"], channel=info["channel"])
+
+
+class CDPSource(VideoSource):
+    """Reads the video from the YouTube tab over the Chrome DevTools Protocol.
+
+    Keyed on the video ID, so re-titled pages don't count as switches.
+    With a prefetcher, the Up Next list is vetted while the video plays.
+    """
+
+    name = "cdp"
+
+    def __init__(self, browser, prefetcher=None, interval: float = 2.0):
+        self.browser = browser
+        self.prefetcher = prefetcher
+        self.interval = interval
+        self._prefetch_task = None
+
+    async def start(self) -> bool:
+        if await self.browser.connect():
+            console.print(f"✓ 已連接到 Chrome ({self.browser.cdp_url})")
+            return True
+        console.print(f"❌ 連接 Chrome 失敗 ({self.browser.cdp_url})")
+        console.print("   請確認 Chrome 是用 --remote-debugging-port=9222 啟動的")
+        return False
+
+    async def poll(self) -> VideoEvent | None:
+        info = await self.browser.get_current_video_info()
+        if not info or not info.get("video_id"):
+            return None
+
+        # One prefetch at a time; a slow page just skips a round
+        if self.prefetcher and (self._prefetch_task is None or self._prefetch_task.done()):
+            self._prefetch_task = asyncio.create_task(self._prefetch())
+
+        return VideoEvent(
+            key=info["video_id"],
+            title=info.get("title"),
+            channel=info.get("channel"),
+            video_id=info["video_id"],
+            url=info.get("url"),
+        )
+
+    async def _prefetch(self):
+        candidates = await self.browser.get_up_next(self.prefetcher.max_candidates)
+        if candidates:
+            await self.prefetcher.prefetch(candidates)
+
+    async def close(self):
+        if self._prefetch_task:
+            self._prefetch_task.cancel()
+            await asyncio.gather(self._prefetch_task, return_exceptions=True)
+        if self.prefetcher:
+            await self.prefetcher.close()
+        await self.browser.close()
+
+
+class ManualSource(VideoSource):
+    """Checks on demand: Enter requests a check, anything else is a command.
+
+    The window title is still read so switches are reported.
+    """
+
+    name = "manual"
+    interval = 0
+    watches_presence = False
+
+    def __init__(self, prompt: str = "👉 按 Enter 擷取截圖（或輸入指令）: "):
+        self.prompt = prompt
+
+    async def poll(self) -> VideoEvent | None:
+        try:
+            line = (await read_line(self.prompt)).strip().lower()
+        except EOFError:
+            return VideoEvent(key=None, command="stop")
+
+        if line:
+            return VideoEvent(key=None, command=line)
+
+        try:
+            info = await asyncio.to_thread(read_window_title)
+        except Exception as e:
+            console.print(f"   ⚠️  無法獲取視窗標題: {e}")
+            info = None
+
+        if info is None:
+            return VideoEvent(key=None, forced=True)
+        return VideoEvent(key=info["full_title"], title=info["title"], channel=info["channel"], forced=True)
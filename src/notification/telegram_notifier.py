@@ -7,28 +7,38 @@ import asyncio
 from pathlib import Path
 from loguru import logger
 
-try:
-    from telegram import Bot
-    from telegram.error import TelegramError
-except ImportError:
-    Bot = None
-    TelegramError = Exception
+# Loaded by _load_telegram, so a disabled notifier never imports the SDK
+Bot = None
+TelegramError = Exception
+
+
+def _load_telegram() -> bool:
+    """Import python-telegram-bot on first use."""
+    global Bot, TelegramError
+    if Bot is None:
+        try:
+            from telegram import Bot as _Bot
+            from telegram.error import TelegramError as _TelegramError
+        except ImportError:
+            return False
+        Bot, TelegramError = _Bot, _TelegramError
+    return True
 
 
 class TelegramNotifier:
     """Sends notifications via Telegram."""
     
     def __init__(self, config: dict):
-        self.enabled = config.get("enabled", False)
+        telegram_config = config.get("telegram", {})
+        self.enabled = config.get("enabled", False) and telegram_config.get("enabled", True)
         self.include_screenshot = config.get("include_screenshot", True)
         self.block_only = config.get("block_only", False)
         
-        telegram_config = config.get("telegram", {})
         self.bot_token = telegram_config.get("bot_token")
         self.chat_id = telegram_config.get("chat_id")
         
         self.bot = None
-        if Bot and self.bot_token and self.enabled:
+        if self.enabled and self.bot_token and _load_telegram():
             self.bot = Bot(token=self.bot_token)
             logger.info("TelegramNotifier initialized")
         elif self.enabled:
@@ -72,6 +82,7 @@ class TelegramNotifier:
             "skip": "⏭️",
             "redirect": "↩️",
             "pause": "⏸️",
+            "overlay": "🛑",
             "notify_only": "📢"
         }
         
@@ -81,11 +92,16 @@ class TelegramNotifier:
         
         categories = ", ".join(analysis.get("categories", [])) or "Unknown"
         
+        others = viewer.get("viewers", [])[1:]
+        with_line = ""
+        if others:
+            with_line = "\n👥 **With:** " + ", ".join(f"{v['name']} (age {v['age']})" for v in others)
+        
         message = f"""🛡️ **KidGuard Alert**
 
 {emoji} **Inappropriate content detected**
 
-👤 **Viewer:** {viewer.get('name', 'Unknown')} (age {viewer.get('age', '?')})
+👤 **Viewer:** {viewer.get('name', 'Unknown')} (age {viewer.get('age', '?')}){with_line}
 📋 **Categories:** {categories}
 ⚡ **Severity:** {severity.upper()}
 📝 **Reason:** {analysis.get('reason', 'N/A')}
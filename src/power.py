@@ -0,0 +1,162 @@
+"""CPU and battery budget for the protection loop.
+
+KidGuard runs all day on a laptop. The governor measures the CPU time
+used by the process and its face worker processes, and when that goes
+over the configured budget it steps down to a cheaper `PowerLevel`:
+smaller and fewer screen frames, a longer check interval, and face
+checks on only every few checks. On battery the lower battery budget
+applies and the loop never runs at full rate. Protection never stops;
+each level only bounds how much it costs.
+"""
+
+import time
+from dataclasses import dataclass
+from loguru import logger
+
+from src.metrics import metrics
+from src.settings import PowerSettings
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+@dataclass(frozen=True, slots=True)
+class PowerLevel:
+    """How much work one check may do."""
+
+    capture_scale: float  # screen frames are resized by this factor
+    max_frames: int  # frames per clip
+    png_level: int  # zlib level for saved frames (lower = less CPU)
+    interval_factor: float  # check_interval is multiplied by this
+    face_every: int  # identify the viewer on every Nth check
+
+
+LEVELS = (
+    PowerLevel(capture_scale=1.0, max_frames=5, png_level=6, interval_factor=1.0, face_every=1),
+    PowerLevel(capture_scale=0.75, max_frames=3, png_level=1, interval_factor=1.5, face_every=1),
+    PowerLevel(capture_scale=0.5, max_frames=2, png_level=1, interval_factor=2.0, face_every=2),
+    PowerLevel(capture_scale=0.5, max_frames=1, png_level=1, interval_factor=3.0, face_every=3),
+)
+
+# Least throttled level allowed on battery
+BATTERY_LEVEL = 1
+# Step back up only when well under budget, so levels don't flap
+RELAX_BELOW = 0.5
+# The battery state changes slowly; reading it can be slow on some systems
+BATTERY_POLL = 60.0
+
+
+class PowerGovernor:
+    """Picks a `PowerLevel` that keeps CPU use under the budget.
+
+    Call `sample()` once per check; it measures at most every
+    `sample_interval` seconds and moves at most one level per sample.
+    Without psutil (or with `enabled: false`) the full level is used.
+    """
+
+    def __init__(self, settings: PowerSettings):
+        self.settings = settings
+        self.index = 0
+        self.cpu_percent = 0.0
+        self.on_battery = False
+
+        self._process = psutil.Process() if psutil is not None else None
+        self._cpu_times: dict[int, float] = {}
+        self._sampled_at = None
+        self._battery_at = None
+        self._checks_since_face = 0
+
+    @property
+    def level(self) -> PowerLevel:
+        return LEVELS[self.index]
+
+    @property
+    def budget(self) -> float:
+        return self.settings.battery_cpu_percent if self.on_battery else self.settings.cpu_percent
+
+    def update(self, settings: PowerSettings):
+        """Apply reloaded settings; the next sample uses the new budget."""
+        self.settings = settings
+        if not settings.enabled:
+            self._set_index(0)
+
+    def sample(self, now: float | None = None) -> PowerLevel:
+        """Measure CPU use since the last sample and adjust the level."""
+        if not self.settings.enabled or self._process is None:
+            return self.level
+
+        now = time.monotonic() if now is None else now
+        if self._sampled_at is not None and now - self._sampled_at < self.settings.sample_interval:
+            return self.level
+
+        cpu_seconds = self._cpu_seconds()
+        first = self._sampled_at is None
+        if not first:
+            cores = psutil.cpu_count() or 1
+            self.cpu_percent = 100.0 * cpu_seconds / ((now - self._sampled_at) * cores)
+            metrics.cpu_percent.set(self.cpu_percent)
+        self._sampled_at = now
+
+        if self._battery_at is None or now - self._battery_at >= BATTERY_POLL:
+            self._battery_at = now
+            self._read_battery()
+
+        index = self.index
+        if not first and self.cpu_percent > self.budget:
+            index += 1
+        elif not first and self.cpu_percent < self.budget * RELAX_BELOW:
+            index -= 1
+        floor = BATTERY_LEVEL if self.on_battery else 0
+        self._set_index(max(floor, min(index, len(LEVELS) - 1)))
+        return self.level
+
+    def face_check_due(self) -> bool:
+        """Whether this check should identify the viewer again."""
+        self._checks_since_face += 1
+        if self._checks_since_face >= self.level.face_every:
+            self._checks_since_face = 0
+            return True
+        return False
+
+    def _set_index(self, index: int):
+        if index == self.index:
+            return
+        level = LEVELS[index]
+        logger.info(
+            f"Power level {self.index} -> {index} (CPU {self.cpu_percent:.1f}% of {self.budget:g}% budget"
+            f"{', on battery' if self.on_battery else ''}): frames x{level.capture_scale:g}, "
+            f"{level.max_frames} per clip, interval x{level.interval_factor:g}, faces every {level.face_every}"
+        )
+        self.index = index
+        metrics.power_level.set(index)
+
+    def _cpu_seconds(self) -> float:
+        """CPU seconds used since the last call by this process and its children."""
+        times = {}
+        try:
+            processes = [self._process, *self._process.children(recursive=True)]
+        except psutil.Error:
+            processes = [self._process]
+        for process in processes:
+            try:
+                cpu = process.cpu_times()
+                times[process.pid] = cpu.user + cpu.system
+            except psutil.Error:
+                continue
+
+        # Workers that exited since the last call don't count; new ones count from zero
+        used = sum(max(0.0, total - self._cpu_times.get(pid, 0.0)) for pid, total in times.items())
+        self._cpu_times = times
+        return used
+
+    def _read_battery(self):
+        try:
+            battery = psutil.sensors_battery()
+        except (AttributeError, NotImplementedError, OSError):
+            battery = None
+        on_battery = battery is not None and battery.power_plugged is False
+        if on_battery != self.on_battery:
+            logger.info("Running on battery" if on_battery else "Running on mains power")
+            self.on_battery = on_battery
@@ -0,0 +1 @@
+# Session record / replay
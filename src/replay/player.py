@@ -0,0 +1,248 @@
+"""Session replay.
+
+Feeds a recording made by `SessionRecorder` through the real KidGuard
+pipeline. The webcam, screen, browser and Claude API are replaced by
+stand-ins that return the recorded results after the recorded delays,
+so a session can be re-run without a display, webcam or network.
+
+`time_scale` stretches every recorded delay: 1.0 replays in real time,
+0.1 ten times faster, and 0 as fast as possible (check interval and
+action cooldown are scaled the same way).
+"""
+
+import asyncio
+import json
+import time
+from collections import defaultdict, deque
+from pathlib import Path
+from loguru import logger
+
+from src.control.action_dispatcher import ActionDispatcher
+from src.metrics import metrics
+from src.settings import Settings
+
+
+class Recording:
+    """Recorded calls, queued per (component, method) in call order."""
+
+    def __init__(self, events: list[dict]):
+        self.events = events
+        self.settings = {}
+        self._calls = defaultdict(deque)
+        for event in events:
+            if event["component"] == "session":
+                self.settings.update(event.get("result") or {})
+            else:
+                self._calls[(event["component"], event["method"])].append(event)
+
+    @classmethod
+    def load(cls, path: str | Path) -> "Recording":
+        events = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    events.append(json.loads(line))
+        return cls(events)
+
+    @property
+    def duration(self) -> float:
+        return self.events[-1]["t"] if self.events else 0.0
+
+    def next(self, component: str, method: str) -> dict | None:
+        calls = self._calls.get((component, method))
+        return calls.popleft() if calls else None
+
+
+class _ReplayComponent:
+    def __init__(self, session: "ReplaySession"):
+        self.session = session
+
+    async def _replay(self, component: str, method: str, default=None):
+        event = self.session.recording.next(component, method)
+        if event is None:
+            return default
+        await self.session.wait(event["duration"])
+        return event["result"] if event["result"] is not None else default
+
+
+class ReplayDetector(_ReplayComponent):
+    async def is_youtube_active(self) -> bool:
+        event = self.session.recording.next("detector", "is_youtube_active")
+        if event is None:
+            # Recording exhausted
+            self.session.finished.set()
+            return False
+        self.session.checks += 1
+        await self.session.wait(event["duration"])
+        return bool(event["result"])
+
+    async def capture_clip(self, duration: int = 5) -> dict:
+        result = await self._replay("detector", "capture_clip", {"frames": []})
+        return {"frames": result.get("frames", []), "audio": None}
+
+
+class ReplayFaceRecognizer(_ReplayComponent):
+    async def identify_viewer(self) -> dict | None:
+        return await self._replay("face", "identify_viewer")
+
+    async def warm_up(self):
+        pass
+
+    def start_watching(self):
+        pass
+
+    def update_family(self, family_config: list):
+        pass
+
+    def set_check_interval(self, seconds: float):
+        pass
+
+    def release_camera(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class ReplayBrowser(_ReplayComponent):
+    async def get_current_video_info(self) -> dict | None:
+        return await self._replay("browser", "get_current_video_info")
+
+    async def get_up_next(self, limit: int = 5) -> list[dict]:
+        return await self._replay("browser", "get_up_next", [])
+
+    async def connect(self) -> bool:
+        return False
+
+    async def _action(self, method: str, *args) -> bool:
+        await self._replay("browser", method)
+        self.session.actions.append((time.monotonic(), method, args))
+        return True
+
+    async def skip_video(self):
+        return await self._action("skip_video")
+
+    async def pause_video(self):
+        return await self._action("pause_video")
+
+    async def redirect_to_channel(self, channel_id: str):
+        return await self._action("redirect_to_channel", channel_id)
+
+    async def redirect_to_video(self, video_id: str):
+        return await self._action("redirect_to_video", video_id)
+
+    async def show_block_overlay(self, message: str | None = None) -> bool:
+        return await self._action("show_block_overlay")
+
+    async def push_blocklist(self, video_ids) -> bool:
+        await self._replay("browser", "push_blocklist")
+        return True
+
+    async def close(self):
+        pass
+
+
+class ReplayAnalyzer(_ReplayComponent):
+    client = None
+
+    def __init__(self, session: "ReplaySession"):
+        super().__init__(session)
+        self.in_flight = 0
+
+    async def warm_up(self):
+        pass
+
+    async def analyze(self, capture: dict) -> dict:
+        self.in_flight += 1
+        try:
+            return await self._replay("analyzer", "analyze", {
+                "inappropriate": False, "reason": "Not recorded", "categories": [],
+                "severity": "none", "confidence": 0, "recommendation": "allow",
+            })
+        finally:
+            self.in_flight -= 1
+
+
+class ReplayNotifier:
+    async def notify(self, viewer: dict, analysis: dict, action_taken: str):
+        pass
+
+
+class ReplaySession:
+    """Runs one recording through a KidGuard instance."""
+
+    def __init__(self, recording: Recording, time_scale: float = 1.0, config_path: str = "config/config.yaml"):
+        self.recording = recording
+        self.time_scale = time_scale
+        self.config_path = config_path
+        self.finished = asyncio.Event()
+        self.checks = 0
+        self.actions = []
+
+    async def wait(self, duration: float):
+        await asyncio.sleep(duration * self.time_scale if self.time_scale > 0 else 0)
+
+    def _build_app(self):
+        # Imported here so recording support doesn't pull in the whole app
+        from kidguard import KidGuard
+
+        app = KidGuard(self.config_path)
+        rules = app.config.setdefault("rules", {})
+        for key in ("check_interval", "clip_duration", "action"):
+            if key in self.recording.settings:
+                rules[key] = self.recording.settings[key]
+        rules["check_interval"] = rules.get("check_interval", 30) * self.time_scale
+        rules["action_cooldown"] = rules.get("action_cooldown", 30) * self.time_scale
+        # Replays run at the recorded pace, not throttled by the CPU budget
+        app.config["power"] = {"enabled": False}
+        app.settings = Settings.from_config(app.config)
+        app.governor.update(app.settings.power)
+
+        app.metrics_server = None
+        app.detector = ReplayDetector(self)
+        app.face_recognizer = ReplayFaceRecognizer(self)
+        app.browser_controller = ReplayBrowser(self)
+        app.content_analyzer = ReplayAnalyzer(self)
+        app.notifier = ReplayNotifier()
+        app.action_dispatcher = ActionDispatcher(cooldown=app.settings.rules.action_cooldown)
+        # The prefetcher keeps its keyword filter, but has no analyzer to call
+        app.prefetcher.content_analyzer = None
+        return app
+
+    async def _drain(self, app):
+        """Let the last clip's analysis and action finish."""
+        while (
+            not app._pending_clips.empty()
+            or app.content_analyzer.in_flight
+            or app.action_dispatcher.pending
+        ):
+            await asyncio.sleep(0.01)
+
+    async def run(self) -> dict:
+        """Replay the whole recording and summarize the run."""
+        app = self._build_app()
+        metrics.reset()
+
+        start = time.monotonic()
+        task = asyncio.create_task(app.run())
+        await self.finished.wait()
+        await self._drain(app)
+        app.stop()
+        await task
+        wall = time.monotonic() - start
+
+        summary = metrics.time_to_intervention
+        report = {
+            "recorded_seconds": round(self.recording.duration, 3),
+            "wall_seconds": round(wall, 3),
+            "time_scale": self.time_scale,
+            "checks": self.checks,
+            "checks_per_second": round(self.checks / wall, 2) if wall > 0 else None,
+            "interventions": len(self.actions),
+            "time_to_intervention_ms": {
+                f"p{int(q * 100)}": None if summary.quantile(q) is None else round(summary.quantile(q) * 1000, 1)
+                for q in summary.quantiles
+            },
+        }
+        logger.info(f"Replay finished: {report}")
+        return report
@@ -0,0 +1,152 @@
+"""Session recorder.
+
+Writes what the daemon saw and decided to a JSON-lines file, so a real
+session can be replayed later through the pipeline (see `player.py`).
+
+Each line is one component call:
+
+    {"t": 12.503, "component": "face", "method": "identify_viewer",
+     "duration": 0.287, "result": {"name": "Amy", "age": 6, ...}}
+
+`t` is seconds since recording started and `duration` how long the call
+took. Captured frames are stored as SHA-1 hashes, not images.
+"""
+
+import asyncio
+import hashlib
+import inspect
+import json
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from loguru import logger
+
+# Calls worth recording per component; everything else passes through
+RECORDED_METHODS = {
+    "detector": {"is_youtube_active", "capture_clip"},
+    "face": {"identify_viewer"},
+    "browser": {
+        "get_current_video_info", "get_up_next", "skip_video", "pause_video",
+        "redirect_to_channel", "redirect_to_video", "show_block_overlay", "push_blocklist",
+    },
+    "analyzer": {"analyze"},
+}
+
+
+def _hash_file(path: str) -> str | None:
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha1(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _serialize(component: str, method: str, args: tuple, result):
+    """JSON-friendly copy of a call result (and arguments where they matter)."""
+    if method == "capture_clip":
+        frames = (result or {}).get("frames", [])
+        return {"frames": [_hash_file(f) for f in frames]}
+    if method == "analyze" and isinstance(result, dict):
+        return {k: v for k, v in result.items() if k != "raw_response"}
+    if method == "push_blocklist":
+        return {"video_ids": sorted(args[0]) if args else [], "ok": result}
+    if method in ("redirect_to_channel", "redirect_to_video"):
+        return {"target": args[0] if args else None, "ok": result}
+    return result
+
+
+class _RecordingProxy:
+    """Forwards every attribute to `target`, recording the listed calls."""
+
+    def __init__(self, target, component: str, recorder: "SessionRecorder"):
+        self._target = target
+        self._component = component
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        if name not in RECORDED_METHODS[self._component] or not inspect.iscoroutinefunction(attr):
+            return attr
+
+        async def recorded(*args, **kwargs):
+            start = time.monotonic()
+            try:
+                result = await attr(*args, **kwargs)
+            except asyncio.CancelledError:
+                # Keep dropped calls (speculative captures) so replays stay aligned
+                self._recorder.record(self._component, name, time.monotonic() - start, None, cancelled=True)
+                raise
+            self._recorder.record(
+                self._component, name, time.monotonic() - start,
+                _serialize(self._component, name, args, result)
+            )
+            return result
+
+        return recorded
+
+    def __setattr__(self, name, value):
+        if name.startswith("_"):
+            object.__setattr__(self, name, value)
+        else:
+            # e.g. capture settings lowered by the power governor
+            setattr(self._target, name, value)
+
+
+class SessionRecorder:
+    """Records component calls of a running KidGuard to a JSON-lines file."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "w", encoding="utf-8")
+        self._lock = threading.Lock()
+        self._start = time.monotonic()
+        self.count = 0
+
+    @classmethod
+    def from_config(cls, config: dict) -> "SessionRecorder | None":
+        """Build a recorder from the `recording` config section, if enabled."""
+        if not config.get("enabled", False):
+            return None
+        directory = Path(config.get("dir", "recordings"))
+        return cls(directory / f"session_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+
+    def attach(self, app):
+        """Wrap the components of a KidGuard instance."""
+        app.detector = _RecordingProxy(app.detector, "detector", self)
+        app.face_recognizer = _RecordingProxy(app.face_recognizer, "face", self)
+        app.browser_controller = _RecordingProxy(app.browser_controller, "browser", self)
+        app.content_analyzer = _RecordingProxy(app.content_analyzer, "analyzer", self)
+        rules = app.settings.rules
+        self.record("session", "config", 0.0, {
+            "check_interval": rules.check_interval,
+            "clip_duration": rules.clip_duration,
+            "action": rules.action.value,
+        })
+        logger.info(f"Recording session to {self.path}")
+
+    def record(self, component: str, method: str, duration: float, result, cancelled: bool = False):
+        event = {
+            "t": round(time.monotonic() - self._start, 4),
+            "component": component,
+            "method": method,
+            "duration": round(duration, 4),
+            "result": result,
+        }
+        if cancelled:
+            event["cancelled"] = True
+        line = json.dumps(event, ensure_ascii=False, default=str)
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.write(line + "\n")
+            self._file.flush()
+            self.count += 1
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+                logger.info(f"Recorded {self.count} events to {self.path}")
@@ -0,0 +1,244 @@
+"""Typed runtime settings for KidGuard.
+
+`Settings.from_config` compiles the raw YAML dict once into frozen,
+slotted objects with the lookups the protection loop needs already
+worked out (action enum, safe-channel ID set, category bitmasks), so
+the loop never walks nested dicts. Invalid values raise `ConfigError`
+when the config is loaded, not in the middle of a session.
+"""
+
+import re
+from dataclasses import dataclass
+from enum import Enum, IntFlag, auto
+
+
+class ConfigError(ValueError):
+    """The config file has a missing or invalid setting."""
+
+
+class Action(str, Enum):
+    """What to do when inappropriate content is detected."""
+
+    SKIP = "skip"
+    REDIRECT = "redirect"
+    PAUSE = "pause"
+    OVERLAY = "overlay"
+    NOTIFY_ONLY = "notify_only"
+
+    def __str__(self) -> str:
+        return self.value
+
+
+class Category(IntFlag):
+    """Content categories, as used in `block_categories` / `warn_categories`."""
+
+    NONE = 0
+    VIOLENCE = auto()
+    HORROR = auto()
+    ADULT = auto()
+    DRUGS = auto()
+    GAMBLING = auto()
+    DISTURBING = auto()
+    EXCESSIVE_CONSUMERISM = auto()
+    CLICKBAIT = auto()
+    LOUD_CONTENT = auto()
+    KEYWORD = auto()
+
+    @classmethod
+    def parse(cls, names, strict: bool = False) -> "Category":
+        """Combine category names into one mask.
+
+        Unknown names raise `ConfigError` when `strict` (config values) and
+        are ignored otherwise (free-form categories in analyzer verdicts).
+        """
+        if isinstance(names, str):
+            names = [names]
+        mask = cls.NONE
+        for name in names or ():
+            category = _category_by_name(name)
+            if category is None:
+                if strict:
+                    known = ", ".join(c.name.lower() for c in cls if c)
+                    raise ConfigError(f"Unknown category '{name}' (known: {known})")
+                continue
+            mask |= category
+        return mask
+
+
+# Spellings the analyzer uses for the same categories
+_CATEGORY_ALIASES = {
+    "adult_content": "adult",
+    "sexual": "adult",
+    "drugs_alcohol": "drugs",
+    "alcohol": "drugs",
+    "disturbing_content": "disturbing",
+    "consumerism": "excessive_consumerism",
+    "loud": "loud_content",
+}
+
+
+def _category_by_name(name) -> Category | None:
+    key = re.sub(r"[\s/-]+", "_", str(name).strip().lower())
+    key = _CATEGORY_ALIASES.get(key, key)
+    return Category.__members__.get(key.upper())
+
+
+def _number(config: dict, section: str, key: str, default, minimum=None, maximum=None, kind=float):
+    value = config.get(key)
+    if value is None:
+        # Left empty in the YAML (or the web form)
+        value = default
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ConfigError(f"{section}.{key} must be a number, got {value!r}")
+    if (minimum is not None and value < minimum) or (maximum is not None and value > maximum):
+        limits = f">= {minimum}" if maximum is None else f"between {minimum} and {maximum}"
+        raise ConfigError(f"{section}.{key} must be {limits}, got {value!r}")
+    return kind(value)
+
+
+def _section(config: dict, name: str) -> dict:
+    section = config.get(name)
+    if section is None:
+        return {}
+    if not isinstance(section, dict):
+        raise ConfigError(f"'{name}' must be a mapping, got {type(section).__name__}")
+    return section
+
+
+@dataclass(frozen=True, slots=True)
+class RuleSettings:
+    """The `rules` section."""
+
+    max_child_age: int
+    action: Action
+    action_cooldown: float
+    check_interval: float
+    clip_duration: int
+
+    @classmethod
+    def from_config(cls, rules: dict) -> "RuleSettings":
+        action = rules.get("action", "redirect")
+        try:
+            action = Action(action)
+        except ValueError:
+            choices = " | ".join(a.value for a in Action)
+            raise ConfigError(f"rules.action must be one of {choices}, got {action!r}") from None
+
+        return cls(
+            max_child_age=_number(rules, "rules", "max_child_age", 12, minimum=1, kind=int),
+            action=action,
+            action_cooldown=_number(rules, "rules", "action_cooldown", 30, minimum=0),
+            check_interval=_number(rules, "rules", "check_interval", 30, minimum=0),
+            clip_duration=_number(rules, "rules", "clip_duration", 5, minimum=1, kind=int),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class AnalysisSettings:
+    """The `analysis` section, with categories compiled to bitmasks."""
+
+    use_ai_analysis: bool
+    block_categories: Category
+    warn_categories: Category
+    confidence_threshold: float
+
+    @classmethod
+    def from_config(cls, analysis: dict) -> "AnalysisSettings":
+        return cls(
+            use_ai_analysis=bool(analysis.get("use_ai_analysis", True)),
+            block_categories=Category.parse(analysis.get("block_categories", []), strict=True),
+            warn_categories=Category.parse(analysis.get("warn_categories", []), strict=True),
+            confidence_threshold=_number(
+                analysis, "analysis", "confidence_threshold", 0.7, minimum=0, maximum=1
+            ),
+        )
+
+    def _confident_match(self, verdict: dict, mask: Category) -> bool:
+        if not mask:
+            return False
+        confidence = verdict.get("confidence") or 0
+        if not isinstance(confidence, (int, float)) or confidence < self.confidence_threshold:
+            return False
+        return bool(Category.parse(verdict.get("categories")) & mask)
+
+    def blocks(self, verdict: dict) -> bool:
+        """Whether a verdict calls for an intervention.
+
+        The analyzer's own recommendation always counts; on top of that,
+        any blocked category found with enough confidence does.
+        """
+        return bool(verdict.get("inappropriate")) or self._confident_match(verdict, self.block_categories)
+
+    def warns(self, verdict: dict) -> bool:
+        """Whether a verdict should be logged as a warning (no action)."""
+        return self._confident_match(verdict, self.warn_categories)
+
+
+@dataclass(frozen=True, slots=True)
+class PowerSettings:
+    """The `power` section (CPU budget, in percent of all cores)."""
+
+    enabled: bool
+    cpu_percent: float
+    battery_cpu_percent: float
+    sample_interval: float
+
+    @classmethod
+    def from_config(cls, power: dict) -> "PowerSettings":
+        cpu_percent = _number(power, "power", "cpu_percent", 20, minimum=1, maximum=100)
+        return cls(
+            enabled=bool(power.get("enabled", True)),
+            cpu_percent=cpu_percent,
+            battery_cpu_percent=_number(
+                power, "power", "battery_cpu_percent", min(10, cpu_percent), minimum=1, maximum=cpu_percent
+            ),
+            sample_interval=_number(power, "power", "sample_interval", 10, minimum=1),
+        )
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Everything the protection loop reads at runtime."""
+
+    rules: RuleSettings
+    analysis: AnalysisSettings
+    power: PowerSettings
+    safe_channel_ids: frozenset[str]
+    # Where `redirect` sends the child: the first safe channel
+    redirect_channel_id: str | None
+
+    @classmethod
+    def from_config(cls, config: dict) -> "Settings":
+        """Validate and compile a loaded config.
+
+        Raises:
+            ConfigError: naming the first invalid setting
+        """
+        if not isinstance(config, dict):
+            raise ConfigError("Config must be a mapping")
+
+        channels = config.get("safe_channels") or []
+        if not isinstance(channels, list):
+            raise ConfigError("safe_channels must be a list")
+        channel_ids = []
+        for channel in channels:
+            channel_id = channel.get("id") if isinstance(channel, dict) else None
+            if not channel_id or not isinstance(channel_id, str):
+                raise ConfigError(f"safe_channels entry needs an 'id': {channel!r}")
+            channel_ids.append(channel_id)
+
+        family = config.get("family") or []
+        if not isinstance(family, list):
+            raise ConfigError("family must be a list")
+        for member in family:
+            if not isinstance(member, dict) or not member.get("name"):
+                raise ConfigError(f"family entry needs a 'name': {member!r}")
+            _number(member, f"family[{member['name']}]", "age", 0, minimum=0)
+
+        return cls(
+            rules=RuleSettings.from_config(_section(config, "rules")),
+            analysis=AnalysisSettings.from_config(_section(config, "analysis")),
+            power=PowerSettings.from_config(_section(config, "power")),
+            safe_channel_ids=frozenset(channel_ids),
+            redirect_channel_id=channel_ids[0] if channel_ids else None,
+        )
@@ -0,0 +1,255 @@
+"""Decision tracing for KidGuard.
+
+Records the stages of individual decisions as Chrome trace events, so a
+single slow check can be opened in Perfetto (ui.perfetto.dev) or
+chrome://tracing and read as a timeline.
+
+    trace = tracer.begin("check")
+    with tracer.activate(trace):
+        with tracer.span("identify"):
+            ...
+    tracer.end(trace, verdict="block")
+
+Tracing is off by default. While it is off `begin` returns None and
+`span` returns a shared no-op object, so instrumented code costs one
+attribute check per span.
+
+Each decision is drawn on its own track ("lane"); spans that run in
+parallel within a decision, like viewer identification and clip capture,
+get extra lanes so every track nests cleanly. Lanes are reused once free.
+"""
+
+import contextvars
+import heapq
+import json
+import os
+import threading
+import time
+import uuid
+from pathlib import Path
+from loguru import logger
+
+from src.utils.log_sink import BatchedWriter
+
+_current = contextvars.ContextVar("kidguard_trace_span", default=None)
+
+
+class _NullSpan:
+    """Stand-in when tracing is off or no decision is being traced."""
+
+    trace_id = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """One timed stage of a decision (a Chrome "complete" event)."""
+
+    __slots__ = ("tracer", "trace_id", "name", "args", "parent", "lane", "start",
+                 "own_lane", "lane_busy", "_token")
+
+    def __init__(self, tracer: "Tracer", trace_id: str, name: str, args: dict, parent: "Span | None"):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.name = name
+        self.args = args
+        self.parent = parent
+        self.lane = None
+        self.start = 0.0
+        self.own_lane = False
+        self.lane_busy = False  # a child currently occupies this span's lane
+        self._token = None
+
+    def set(self, **args):
+        """Attach extra details shown in the trace viewer."""
+        self.args.update(args)
+
+    def _open(self):
+        parent = self.parent
+        if parent is None or parent.lane_busy:
+            self.lane = self.tracer._acquire_lane()
+            self.own_lane = True
+        else:
+            self.lane = parent.lane
+            parent.lane_busy = True
+        self.start = time.perf_counter()
+
+    def _close(self, error: BaseException | None = None):
+        duration = time.perf_counter() - self.start
+        if error is not None:
+            self.args["error"] = type(error).__name__
+        self.tracer._emit(self, duration)
+
+        if self.own_lane:
+            self.tracer._release_lane(self.lane)
+        elif self.parent is not None:
+            self.parent.lane_busy = False
+
+    def __enter__(self):
+        self._open()
+        self._token = _current.set(self)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current.reset(self._token)
+        self._close(exc)
+        return False
+
+
+class _Activation:
+    """Makes a decision's root span the parent of spans in this context."""
+
+    __slots__ = ("span", "_token")
+
+    def __init__(self, span: Span):
+        self.span = span
+        self._token = None
+
+    def __enter__(self):
+        self._token = _current.set(self.span)
+        return self.span
+
+    def __exit__(self, *exc):
+        _current.reset(self._token)
+        return False
+
+
+class Tracer:
+    """Writes decision spans to a rotating Chrome trace-event JSON file.
+
+    The file is a JSON array without its closing bracket, which the trace
+    viewers accept, so events can be appended as they finish. Events go
+    through a `BatchedWriter`, so the file is written off the event loop.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.path = Path("logs/trace.json")
+        self.max_bytes = 20 * 1024 * 1024
+        self.backup_count = 3
+
+        self._lock = threading.Lock()
+        self._writer = None
+        self._rotations = 0
+        self._free_lanes: list[int] = []
+        self._next_lane = 1
+        self._named_lanes: set[int] = set()
+        self._epoch = time.perf_counter()
+        self._pid = os.getpid()
+
+    def configure(self, config: dict):
+        """Apply the `tracing` config section."""
+        self.close()
+        self.enabled = config.get("enabled", False)
+        self.path = Path(config.get("file", "logs/trace.json"))
+        self.max_bytes = int(config.get("max_size_mb", 20) * 1024 * 1024)
+        self.backup_count = config.get("backup_count", 3)
+        if self.enabled:
+            logger.info(f"Tracing decisions to {self.path}")
+
+    def begin(self, name: str, **args) -> Span | None:
+        """Start tracing a decision. Returns None while tracing is off."""
+        if not self.enabled:
+            return None
+
+        trace_id = uuid.uuid4().hex[:16]
+        root = Span(self, trace_id, name, {"trace_id": trace_id, **args}, None)
+        root._open()
+        return root
+
+    def end(self, root: Span | None, **args):
+        """Finish a decision started with `begin`."""
+        if root is None:
+            return
+        root.args.update(args)
+        root._close()
+
+    def activate(self, root: Span | None):
+        """Context manager that nests following spans under `root`."""
+        if root is None:
+            return NULL_SPAN
+        return _Activation(root)
+
+    def span(self, name: str, **args):
+        """Context manager timing one stage of the current decision."""
+        if not self.enabled:
+            return NULL_SPAN
+        parent = _current.get()
+        if parent is None:
+            return NULL_SPAN
+        return Span(self, parent.trace_id, name, args, parent)
+
+    def current_trace_id(self) -> str | None:
+        span = _current.get()
+        return span.trace_id if span is not None else None
+
+    def _acquire_lane(self) -> int:
+        with self._lock:
+            if self._free_lanes:
+                return heapq.heappop(self._free_lanes)
+            lane = self._next_lane
+            self._next_lane += 1
+            return lane
+
+    def _release_lane(self, lane: int):
+        with self._lock:
+            heapq.heappush(self._free_lanes, lane)
+
+    def _emit(self, span: Span, duration: float):
+        event = {
+            "name": span.name,
+            "cat": "kidguard",
+            "ph": "X",
+            "ts": round((span.start - self._epoch) * 1e6, 1),
+            "dur": round(duration * 1e6, 1),
+            "pid": self._pid,
+            "tid": span.lane,
+            "args": span.args if span.parent is None else {"trace_id": span.trace_id, **span.args},
+        }
+        try:
+            line = json.dumps(event, ensure_ascii=False, default=str)
+        except (TypeError, ValueError):
+            return
+
+        with self._lock:
+            if self._writer is None:
+                # The previous run's trace is kept as a backup
+                self._writer = BatchedWriter(
+                    self.path, max_bytes=self.max_bytes, backup_count=self.backup_count,
+                    header="[\n", fresh=True, name="trace-writer",
+                )
+                self._rotations = 0
+                self._named_lanes = set()
+            elif self._writer.rotations != self._rotations:
+                # A new file was started; name the lanes again as they reappear
+                self._rotations = self._writer.rotations
+                self._named_lanes = set()
+
+            lane = span.lane
+            if lane not in self._named_lanes:
+                self._named_lanes.add(lane)
+                line = json.dumps({
+                    "name": "thread_name", "ph": "M", "pid": self._pid, "tid": lane,
+                    "args": {"name": f"decision lane {lane}"},
+                }) + ",\n" + line
+            self._writer.write(line + ",\n")
+
+    def close(self):
+        """Write out queued events and close the trace file."""
+        with self._lock:
+            writer, self._writer = self._writer, None
+        if writer is not None:
+            writer.close()
+
+
+tracer = Tracer()
@@ -0,0 +1,118 @@
+"""File watcher module.
+
+Calls back when watched files change. Uses watchdog (inotify on Linux,
+ReadDirectoryChangesW on Windows), which is in requirements.txt; without
+it, falls back to polling modification times.
+"""
+
+import os
+import threading
+from pathlib import Path
+from loguru import logger
+
+try:
+    from watchdog.observers import Observer
+except ImportError:
+    Observer = None
+
+
+class _WakeHandler:
+    """watchdog event handler that just wakes the watcher thread."""
+
+    def __init__(self, wake: threading.Event):
+        self._wake = wake
+
+    def dispatch(self, event):
+        self._wake.set()
+
+
+class FileWatcher:
+    """Watch a few files and call `callback(path)` for each one that changed.
+
+    Files are compared by (mtime, size, inode), so an atomic `os.replace`
+    counts as a change and unrelated events in the same directory don't.
+    The callback runs on the watcher thread, `debounce` seconds after the
+    first event so that bursts of writes are handled once.
+    """
+
+    def __init__(self, paths: list, callback, debounce: float = 0.5, poll_interval: float = 2.0):
+        self.paths = [Path(p) for p in paths]
+        self.callback = callback
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+
+        self._signatures = {path: self._signature(path) for path in self.paths}
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._observer = None
+        self._thread = None
+
+    @staticmethod
+    def _signature(path: Path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def start(self):
+        if self._thread is not None:
+            return
+
+        if Observer is not None:
+            # Watch the directories: replaced files get a new inode
+            self._observer = Observer()
+            handler = _WakeHandler(self._wake)
+            for directory in {path.parent for path in self.paths}:
+                directory.mkdir(parents=True, exist_ok=True)
+                self._observer.schedule(handler, str(directory), recursive=False)
+            self._observer.start()
+        else:
+            logger.info(f"watchdog not installed; checking for file changes every {self.poll_interval:g}s")
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="file-watcher", daemon=True)
+        self._thread.start()
+        logger.debug(
+            f"Watching {', '.join(str(p) for p in self.paths)} "
+            f"({'watchdog' if self._observer else 'polling'})"
+        )
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=2)
+            self._observer = None
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+    def _changed(self) -> list[Path]:
+        changed = []
+        for path in self.paths:
+            signature = self._signature(path)
+            if signature != self._signatures[path]:
+                self._signatures[path] = signature
+                changed.append(path)
+        return changed
+
+    def _run(self):
+        while not self._stop.is_set():
+            if self._observer is not None:
+                if not self._wake.wait(1.0):
+                    continue
+            elif self._stop.wait(self.poll_interval):
+                break
+
+            # Let the writer finish before looking
+            if self._stop.wait(self.debounce):
+                break
+            self._wake.clear()
+
+            for path in self._changed():
+                try:
+                    self.callback(path)
+                except Exception as e:
+                    logger.error(f"Error handling change of {path}: {e}")
@@ -0,0 +1,288 @@
+"""Non-blocking log and console output.
+
+Loguru calls its sinks synchronously, so every DEBUG line used to be a
+file write (and every console line a terminal write) inside whichever
+stage logged it. Here sinks only put the message on a queue; one writer
+thread per destination drains it in batches. Repeated messages are rate
+limited before they reach the queue.
+
+    setup_logging(config)     # once, at startup
+    console.print("...")      # instead of print() in monitoring code
+    close_logging()           # flush before exit (also runs at exit)
+"""
+
+import atexit
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from pathlib import Path
+from loguru import logger
+
+CONSOLE_FORMAT = "<green>{time:HH:mm:ss}</green> | <level>{level: <8}</level> | {message}"
+
+
+class BatchedWriter:
+    """Writes text to a stream or file from a background thread.
+
+    `write` never blocks: when the queue is full the text is dropped and
+    counted, and the count is written once the writer catches up. Files
+    rotate at `max_bytes`, keeping `backup_count` old files; `rotations`
+    counts how often that happened. `header` starts every new file, and
+    `fresh` moves an existing file to the backups instead of appending.
+    """
+
+    def __init__(self, target, max_batch: int = 500, flush_interval: float = 0.1,
+                 max_queue: int = 10000, max_bytes: int = 0, backup_count: int = 0,
+                 header: str = "", fresh: bool = False, name: str = "log-writer"):
+        self.target = target
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.header = header
+        self.fresh = fresh
+        self.dropped = 0
+        self.rotations = 0
+
+        self._queue = queue.Queue(max_queue)
+        self._file = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def write(self, text: str):
+        try:
+            self._queue.put_nowait(text)
+        except queue.Full:
+            self.dropped += 1
+
+    def flush(self, timeout: float = 2.0):
+        """Wait until everything queued so far is written."""
+        done = threading.Event()
+        try:
+            self._queue.put(done, timeout=timeout)
+        except queue.Full:
+            return
+        done.wait(timeout)
+
+    def close(self, timeout: float = 2.0):
+        if self._thread.is_alive():
+            self.flush(timeout)
+            self._queue.put(None)
+            self._thread.join(timeout)
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            # Gather whatever else arrives within flush_interval into the same write
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            text = [item for item in batch if isinstance(item, str)]
+            if self.dropped:
+                text.append(f"[log] dropped {self.dropped} messages (output too slow)\n")
+                self.dropped = 0
+            if text:
+                try:
+                    self._write("".join(text))
+                except (OSError, ValueError):
+                    pass
+
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if None in batch:
+                return
+
+    def _write(self, text: str):
+        if isinstance(self.target, (str, Path)):
+            if self._file is None:
+                path = Path(self.target)
+                path.parent.mkdir(parents=True, exist_ok=True)
+                if self.fresh and path.exists():
+                    self._rotate()
+                self._open()
+            elif self.max_bytes and self._file.tell() > self.max_bytes:
+                self._file.close()
+                self._rotate()
+                self._open()
+            stream = self._file
+        else:
+            stream = self.target
+
+        stream.write(text)
+        stream.flush()
+
+    def _open(self):
+        self._file = open(self.target, "a", encoding="utf-8")
+        if self.header and self._file.tell() == 0:
+            self._file.write(self.header)
+
+    def _rotate(self):
+        self.rotations += 1
+        path = Path(self.target)
+        for i in range(self.backup_count - 1, 0, -1):
+            older = path.with_name(f"{path.name}.{i}")
+            if older.exists():
+                os.replace(older, path.with_name(f"{path.name}.{i + 1}"))
+        if self.backup_count > 0:
+            os.replace(path, path.with_name(f"{path.name}.1"))
+        else:
+            path.unlink(missing_ok=True)
+
+
+class QueueSink:
+    """Loguru sink that hands messages to a `BatchedWriter`.
+
+    With `serialize`, each record becomes one JSON line (time, level,
+    message, where it was logged, bound extras, exception); otherwise the
+    message is written as loguru formatted it.
+    """
+
+    def __init__(self, writer: BatchedWriter, serialize: bool = False):
+        self.writer = writer
+        self.serialize = serialize
+
+    def __call__(self, message):
+        if not self.serialize:
+            self.writer.write(str(message))
+            return
+
+        record = message.record
+        entry = {
+            "time": record["time"].isoformat(),
+            "level": record["level"].name,
+            "message": record["message"],
+            "module": record["name"],
+            "function": record["function"],
+            "line": record["line"],
+        }
+        if record["extra"]:
+            entry["extra"] = record["extra"]
+        if record["exception"] is not None:
+            entry["exception"] = str(message).rstrip("\n").split("\n", 1)[-1]
+        self.writer.write(json.dumps(entry, ensure_ascii=False, default=str) + "\n")
+
+
+class RateLimiter:
+    """Loguru filter that lets through `burst` identical messages per `window`.
+
+    Messages are grouped by level and text. The first message let through
+    after a quiet spell says how many repeats were dropped. One limiter
+    can filter several sinks: loguru passes each sink the same record, and
+    a record is only counted once.
+    """
+
+    DECIDED = "_rate_limited"
+
+    def __init__(self, burst: int = 5, window: float = 10.0, max_keys: int = 1000):
+        self.burst = burst
+        self.window = window
+        self.max_keys = max_keys
+        self._seen: dict[tuple, list] = {}  # key -> [window start, count, suppressed]
+        self._lock = threading.Lock()
+
+    def __call__(self, record) -> bool:
+        decided = record.get(self.DECIDED)
+        if decided is None:
+            decided = record[self.DECIDED] = self._allow(record)
+        return decided
+
+    def _allow(self, record) -> bool:
+        key = (record["level"].no, record["message"])
+        now = time.monotonic()
+        with self._lock:
+            state = self._seen.get(key)
+            if state is None or now - state[0] > self.window:
+                suppressed = state[2] if state else 0
+                if len(self._seen) >= self.max_keys:
+                    self._seen = {k: s for k, s in self._seen.items() if now - s[0] <= self.window}
+                self._seen[key] = [now, 1, 0]
+                if suppressed:
+                    record["message"] += f" (repeated {suppressed} more times)"
+                return True
+
+            state[1] += 1
+            if state[1] <= self.burst:
+                return True
+            state[2] += 1
+            return False
+
+
+class Console:
+    """`print` replacement that goes through a `BatchedWriter` on stdout."""
+
+    def __init__(self, stream=None):
+        self._stream = stream
+        self._writer = None
+        self._lock = threading.Lock()
+
+    @property
+    def writer(self) -> BatchedWriter:
+        if self._writer is None:
+            with self._lock:
+                if self._writer is None:
+                    self._writer = BatchedWriter(self._stream or sys.stdout, flush_interval=0.05)
+        return self._writer
+
+    def print(self, *values, sep: str = " ", end: str = "\n"):
+        self.writer.write(sep.join(str(v) for v in values) + end)
+
+    def flush(self, timeout: float = 2.0):
+        if self._writer is not None:
+            self._writer.flush(timeout)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+console = Console()
+_writers: list[BatchedWriter] = []
+
+
+def setup_logging(config: dict | None = None, console_level: str = "INFO"):
+    """Replace loguru's sinks with queued ones.
+
+    Uses the `logging` config section: level and file for the JSON-lines
+    log, max_size_mb / backup_count for its rotation.
+    """
+    section = (config or {}).get("logging", {})
+    limiter = RateLimiter()
+
+    close_logging()
+    logger.remove()
+
+    console_writer = BatchedWriter(sys.stderr, flush_interval=0.05)
+    logger.add(QueueSink(console_writer), format=CONSOLE_FORMAT, level=console_level,
+               colorize=sys.stderr.isatty(), filter=limiter)
+    _writers.append(console_writer)
+
+    if section.get("file", "logs/kidguard.log"):
+        file_writer = BatchedWriter(
+            section.get("file", "logs/kidguard.log"),
+            max_bytes=int(section.get("max_size_mb", 10) * 1024 * 1024),
+            backup_count=section.get("backup_count", 5),
+        )
+        logger.add(QueueSink(file_writer, serialize=True), level=section.get("level", "DEBUG"), filter=limiter)
+        _writers.append(file_writer)
+
+
+def close_logging():
+    """Flush and stop the queued sinks and the console."""
+    console.close()
+    while _writers:
+        _writers.pop().close()
+
+
+atexit.register(close_logging)
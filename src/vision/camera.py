@@ -0,0 +1,178 @@
+"""Camera session module.
+
+Keeps the webcam open and always holds the most recent frame, so face
+checks don't pay the device open / auto-exposure cost on every call.
+"""
+
+import asyncio
+import threading
+import time
+from pathlib import Path
+from loguru import logger
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+
+class CameraSession:
+    """Long-lived camera with a background frame grabber.
+
+    `source` is a device index (webcam) or a path to a video file. Video
+    files loop forever at their native frame rate, which makes the session
+    usable in tests and replays without a webcam.
+
+    The grabber thread starts on first use, discards `warmup_frames` frames
+    while exposure settles, reopens the device after repeated read errors,
+    and releases it after `idle_timeout` seconds without a `read`.
+    """
+
+    def __init__(
+        self,
+        source: int | str = 0,
+        warmup_frames: int = 5,
+        idle_timeout: float = 60.0,
+        reconnect_delay: float = 2.0,
+        max_frame_age: float = 1.0,
+    ):
+        self.source = source
+        self.warmup_frames = warmup_frames
+        self.idle_timeout = idle_timeout
+        self.reconnect_delay = reconnect_delay
+        self.max_frame_age = max_frame_age
+        self.is_file = isinstance(source, str) and Path(source).is_file()
+
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._frame = None
+        self._frame_time = 0.0
+        self._last_used = time.monotonic()
+
+    @classmethod
+    def from_config(cls, config: dict) -> "CameraSession":
+        """Build a session from the `camera` config section."""
+        return cls(
+            source=config.get("source", 0),
+            warmup_frames=config.get("warmup_frames", 5),
+            idle_timeout=config.get("idle_timeout", 60),
+            reconnect_delay=config.get("reconnect_delay", 2),
+        )
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the grabber thread if it is not running."""
+        if cv2 is None:
+            return
+
+        with self._lock:
+            if self.running:
+                return
+            self._stop.clear()
+            self._ready.clear()
+            self._frame = None
+            self._last_used = time.monotonic()
+            self._thread = threading.Thread(target=self._grab_loop, name="camera-grabber", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop grabbing and release the device."""
+        self._stop.set()
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout=5)
+        self._thread = None
+        with self._lock:
+            self._frame = None
+        self._ready.clear()
+
+    def read(self):
+        """Return the latest frame without waiting (None if none yet)."""
+        self._last_used = time.monotonic()
+        if not self.running:
+            self.start()
+            return None
+
+        with self._lock:
+            if self._frame is None or time.monotonic() - self._frame_time > self.max_frame_age:
+                return None
+            return self._frame
+
+    async def get_frame(self, timeout: float = 3.0):
+        """Return the latest frame, waiting for the first one after a (re)start."""
+        frame = self.read()
+        if frame is not None:
+            return frame
+
+        self._ready.clear()
+        if not await asyncio.to_thread(self._ready.wait, timeout):
+            logger.warning("Camera did not deliver a frame in time")
+            return None
+        return self.read()
+
+    def _open(self):
+        cap = cv2.VideoCapture(self.source)
+        if not cap.isOpened():
+            cap.release()
+            return None
+
+        # Let auto-exposure settle; the first frames are often too dark
+        for _ in range(0 if self.is_file else self.warmup_frames):
+            cap.read()
+        return cap
+
+    def _grab_loop(self):
+        cap = None
+        failures = 0
+        frame_delay = 0.0
+
+        try:
+            while not self._stop.is_set():
+                if time.monotonic() - self._last_used > self.idle_timeout:
+                    logger.debug("Camera idle, releasing device")
+                    break
+
+                if cap is None:
+                    cap = self._open()
+                    if cap is None:
+                        logger.warning(f"Could not open camera {self.source}, retrying")
+                        self._stop.wait(self.reconnect_delay)
+                        continue
+                    if self.is_file:
+                        fps = cap.get(cv2.CAP_PROP_FPS) or 30
+                        frame_delay = 1.0 / fps
+                    logger.debug(f"Camera {self.source} opened")
+
+                ok, frame = cap.read()
+                if not ok:
+                    if self.is_file:
+                        cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+                        continue
+                    failures += 1
+                    if failures >= 5:
+                        logger.warning("Camera read failing, reconnecting")
+                        cap.release()
+                        cap = None
+                        failures = 0
+                        self._stop.wait(self.reconnect_delay)
+                    continue
+
+                failures = 0
+                with self._lock:
+                    self._frame = frame
+                    self._frame_time = time.monotonic()
+                self._ready.set()
+
+                if frame_delay:
+                    # Pace video files like a live camera
+                    self._stop.wait(frame_delay)
+        finally:
+            if cap is not None:
+                cap.release()
+            with self._lock:
+                self._frame = None
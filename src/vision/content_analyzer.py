@@ -2,13 +2,16 @@
 
 import base64
 import asyncio
+import importlib.util
 from pathlib import Path
 from loguru import logger
 
-try:
-    import anthropic
-except ImportError:
-    anthropic = None
+from src.metrics import metrics
+from src.tracing import tracer
+
+# The SDK takes about a second to import, so it is only loaded once the
+# analyzer is actually used (see `warm_up`)
+ANTHROPIC_AVAILABLE = importlib.util.find_spec("anthropic") is not None
 
 
 class ContentAnalyzer:
@@ -48,18 +51,53 @@ Be cautious - when in doubt, flag for review. Children's safety is the priority.
         self.model = config.get("model", "claude-sonnet-4-5")
         self.custom_rules = config.get("custom_rules", {})
         self.max_child_age = config.get("max_child_age", 12)
+        self.enabled = bool(
+            ANTHROPIC_AVAILABLE and self.api_key and config.get("use_ai_analysis", True)
+        )
         self.client = None
+        self._warming = None
 
         # Generate analysis prompt with custom rules
         self.analysis_prompt = self._build_analysis_prompt()
 
-        if anthropic and self.api_key:
-            self.client = anthropic.Anthropic(api_key=self.api_key)
+        if self.enabled:
             logger.info("ContentAnalyzer initialized with Claude API")
             logger.info(f"Custom rules enabled: {self._get_enabled_rules()}")
         else:
             logger.warning("Claude API not configured - content analysis disabled")
 
+    def update_rules(self, config: dict):
+        """Recompile the prompt for edited rules.
+
+        The prompt is replaced in one assignment; requests already sent
+        keep the one they were built with.
+        """
+        self.model = config.get("model", "claude-sonnet-4-5")
+        self.custom_rules = config.get("custom_rules", {})
+        self.max_child_age = config.get("max_child_age", 12)
+        self.analysis_prompt = self._build_analysis_prompt()
+        logger.info(f"Analysis rules updated: {self._get_enabled_rules()}")
+
+    async def warm_up(self):
+        """Import the SDK and create the client without blocking the loop.
+
+        Safe to call repeatedly and concurrently; later calls wait for the
+        first one.
+        """
+        if not self.enabled or self.client is not None:
+            return
+        if self._warming is None:
+            self._warming = asyncio.ensure_future(asyncio.to_thread(self._create_client))
+        await asyncio.shield(self._warming)
+
+    def _create_client(self):
+        try:
+            import anthropic
+            self.client = anthropic.Anthropic(api_key=self.api_key)
+        except Exception as e:
+            logger.error(f"Could not create Claude client: {e}")
+            self.enabled = False
+
     def _get_enabled_rules(self) -> list:
         """Get list of enabled custom rule types."""
         enabled = []
@@ -179,6 +217,7 @@ Blocked keywords: {keywords_str}
         Returns:
             Analysis result dict
         """
+        await self.warm_up()
         if not self.client:
             logger.warning("No Claude client available")
             return self._default_result()
@@ -212,51 +251,61 @@ Blocked keywords: {keywords_str}
     async def _analyze_frame(self, frame_path: str) -> dict:
         """Analyze a single frame using Claude Vision."""
         # Read and encode image
-        with open(frame_path, "rb") as f:
-            image_data = base64.b64encode(f.read()).decode("utf-8")
+        with tracer.span("encode") as span:
+            with open(frame_path, "rb") as f:
+                image_data = base64.b64encode(f.read()).decode("utf-8")
+            span.set(bytes=len(image_data))
         
         # Get file extension for media type
         ext = Path(frame_path).suffix.lower()
         media_type = "image/png" if ext == ".png" else "image/jpeg"
         
-        # Call Claude Vision API
-        response = self.client.messages.create(
-            model=self.model,
-            max_tokens=1024,
-            messages=[
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "image",
-                            "source": {
-                                "type": "base64",
-                                "media_type": media_type,
-                                "data": image_data
-                            }
-                        },
+        # Call Claude Vision API (blocking client, so off the event loop)
+        try:
+            with metrics.timer("api"):
+                response = await asyncio.to_thread(
+                    self.client.messages.create,
+                    model=self.model,
+                    max_tokens=1024,
+                    messages=[
                         {
-                            "type": "text",
-                            "text": self.analysis_prompt
+                            "role": "user",
+                            "content": [
+                                {
+                                    "type": "image",
+                                    "source": {
+                                        "type": "base64",
+                                        "media_type": media_type,
+                                        "data": image_data
+                                    }
+                                },
+                                {
+                                    "type": "text",
+                                    "text": self.analysis_prompt
+                                }
+                            ]
                         }
                     ]
-                }
-            ]
-        )
+                )
+        except Exception:
+            metrics.api_call(ok=False)
+            raise
+        metrics.api_call()
         
         # Parse JSON response
         import json
-        response_text = response.content[0].text
-        
-        # Try to extract JSON from response
-        try:
-            # Find JSON in response
-            start = response_text.find("{")
-            end = response_text.rfind("}") + 1
-            if start >= 0 and end > start:
-                return json.loads(response_text[start:end])
-        except json.JSONDecodeError:
-            pass
+        with tracer.span("parse"):
+            response_text = response.content[0].text
+            
+            # Try to extract JSON from response
+            try:
+                # Find JSON in response
+                start = response_text.find("{")
+                end = response_text.rfind("}") + 1
+                if start >= 0 and end > start:
+                    return json.loads(response_text[start:end])
+            except json.JSONDecodeError:
+                pass
         
         # Fallback: assume safe if we can't parse
         logger.warning("Could not parse analysis response")
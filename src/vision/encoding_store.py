@@ -0,0 +1,198 @@
+"""Face encoding store.
+
+Keeps every family member's face samples in one memory-mapped `.npy`
+matrix plus a small JSON index, instead of one pickle per person.
+
+Layout of `encodings/`:
+    faces.json          index: data file name, encoding size, [name, count] blocks
+    faces-000003.npy    float64 matrix, rows grouped by member in index order
+
+Samples are only ever added. Each change writes a new data generation and
+is committed by atomically replacing `faces.json`, so readers (including
+another process) always see a complete index/matrix pair. Writers hold an
+exclusive lock on `faces.json.lock`, so registrations from separate
+processes never overwrite each other's samples.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from loguru import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class EncodingStore:
+    """Consolidated, pickle-free storage for face encodings."""
+
+    INDEX_NAME = "faces.json"
+    ENCODING_SIZE = 128
+
+    def __init__(self, directory: str | Path = "encodings"):
+        self.directory = Path(directory)
+        self.index_path = self.directory / self.INDEX_NAME
+        self.lock_path = self.directory / f"{self.INDEX_NAME}.lock"
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        """Hold the store's write lock, across threads and processes."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(self.lock_path, "a+b") as f:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            else:
+                # LK_LOCK gives up after ~10 s; keep waiting for a slow writer
+                f.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        continue
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def exists(self) -> bool:
+        return self.index_path.exists()
+
+    def _read_index(self) -> dict:
+        if not self.index_path.exists():
+            return {"version": 1, "data": None, "dim": self.ENCODING_SIZE, "members": []}
+        with open(self.index_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def counts(self) -> dict[str, int]:
+        """Number of samples stored per member."""
+        return {name: count for name, count in self._read_index()["members"]}
+
+    def load(self):
+        """Load the encoding matrix and its row labels.
+
+        The matrix is memory-mapped read-only; nothing is unpickled.
+
+        Returns:
+            (matrix, labels) - matrix is None when the store is empty
+        """
+        index = self._read_index()
+        if not index["data"]:
+            return None, []
+
+        matrix = np.load(self.directory / index["data"], mmap_mode="r", allow_pickle=False)
+        labels = [name for name, count in index["members"] for _ in range(count)]
+
+        if len(labels) != len(matrix):
+            raise ValueError(f"Encoding store is inconsistent: {len(labels)} labels, {len(matrix)} rows")
+        return matrix, labels
+
+    def add_samples(self, name: str, encodings) -> int:
+        """Append face samples for a member.
+
+        Returns:
+            Total number of samples now stored for `name`
+        """
+        new = np.atleast_2d(np.asarray(encodings, dtype=np.float64))
+        if new.shape[1] != self.ENCODING_SIZE:
+            raise ValueError(f"Expected {self.ENCODING_SIZE}-d encodings, got {new.shape[1]}")
+
+        with self._locked():
+            index = self._read_index()
+            matrix, _ = self.load()
+
+            blocks = []
+            start = 0
+            found = False
+            for member, count in index["members"]:
+                rows = matrix[start:start + count]
+                start += count
+                if member == name:
+                    rows = np.vstack([rows, new])
+                    found = True
+                blocks.append((member, rows))
+            if not found:
+                blocks.append((name, new))
+
+            self._write(index, blocks)
+            return next(len(rows) for member, rows in blocks if member == name)
+
+    def _write(self, index: dict, blocks: list):
+        """Write a new data generation and atomically commit the index."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        generation = index.get("generation", 0) + 1
+        data_name = f"faces-{generation:06d}.npy"
+
+        matrix = np.vstack([rows for _, rows in blocks]) if blocks else np.empty((0, self.ENCODING_SIZE))
+        tmp_data = self.directory / f".{data_name}.tmp"
+        with open(tmp_data, "wb") as f:
+            np.save(f, np.ascontiguousarray(matrix, dtype=np.float64), allow_pickle=False)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_data, self.directory / data_name)
+
+        new_index = {
+            "version": 1,
+            "generation": generation,
+            "data": data_name,
+            "dim": self.ENCODING_SIZE,
+            "members": [[member, len(rows)] for member, rows in blocks],
+        }
+        tmp_index = self.directory / f".{self.INDEX_NAME}.tmp"
+        with open(tmp_index, "w", encoding="utf-8") as f:
+            json.dump(new_index, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_index, self.index_path)
+
+        # Older generations are unreferenced now. A reader that still maps one
+        # keeps its view on POSIX; on Windows the delete fails and is retried
+        # on the next write.
+        for stale in self.directory.glob("faces-*.npy"):
+            if stale.name != data_name:
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
+
+        logger.debug(f"Encoding store committed generation {generation} ({len(matrix)} samples)")
+
+    def migrate_legacy_pickles(self, names: list[str]) -> int:
+        """One-time import of the old `encodings/<name>.pkl` files.
+
+        Only call this for a store that doesn't exist yet; after migration
+        the pickles are never read again.
+
+        Returns:
+            Number of members imported
+        """
+        import pickle
+
+        imported = 0
+        for name in names:
+            pkl = self.directory / f"{name}.pkl"
+            if not pkl.exists():
+                continue
+            with open(pkl, "rb") as f:
+                self.add_samples(name, pickle.load(f))
+            imported += 1
+
+        if imported:
+            logger.info(f"Migrated {imported} legacy encoding file(s) to {self.index_path}")
+        return imported
@@ -4,51 +4,246 @@ Identifies family members or estimates age of unknown viewers.
 """
 
 import asyncio
+import importlib.util
+import math
+import time
 from pathlib import Path
 from loguru import logger
 
+from src.metrics import metrics
+from src.utils.file_watcher import FileWatcher
+from src.vision.camera import CameraSession
+from src.vision.encoding_store import EncodingStore
+from src.vision.face_tracker import FaceTracker
+from src.vision.viewer_cache import ViewerCache
+from src.vision.face_worker import FaceWorkerPool, detect_faces, encode_faces, estimate_ages
+
 try:
     import cv2
 except ImportError:
     cv2 = None
 
 try:
-    import face_recognition
+    import numpy as np
 except ImportError:
-    face_recognition = None
+    np = None
+
+# dlib models are only loaded inside the face worker processes
+FACE_RECOGNITION_AVAILABLE = importlib.util.find_spec("face_recognition") is not None
+
+# Tracks survive one missed check; identities are re-checked every few checks
+TRACK_GAP_CHECKS = 2.5
+REENCODE_CHECKS = 3
+
+
+def distance_to_confidence(distance: float, tolerance: float) -> float:
+    """Map a face distance to a 0-1 match confidence.
+
+    Distances at the tolerance map to 0.5; closer faces approach 1.0
+    quickly, farther ones fall off linearly.
+    """
+    if distance > tolerance:
+        return max(0.0, (1.0 - distance) / ((1.0 - tolerance) * 2.0))
+
+    linear = 1.0 - distance / (tolerance * 2.0)
+    return linear + (1.0 - linear) * math.pow((linear - 0.5) * 2, 0.2)
 
 
 class FaceRecognizer:
     """Recognizes family members and estimates ages."""
     
-    def __init__(self, family_config: list):
+    def __init__(
+        self,
+        family_config: list,
+        camera_config: dict | None = None,
+        face_config: dict | None = None
+    ):
+        face_config = face_config or {}
         self.family = family_config
-        self.known_encodings = {}
-        self.camera = None
+        self.members = {m["name"]: m for m in family_config if m.get("name")}
+        self.tolerance = face_config.get("tolerance", 0.6)
+        self.detection_scale = face_config.get("detection_scale", 0.5)
+        self.max_child_age = face_config.get("max_child_age", 12)
+        # Configured minimums; stretched to span a few checks (see set_check_interval)
+        self.reencode_ttl = face_config.get("reencode_ttl", 30)
+        self.track_max_gap = face_config.get("track_max_gap", 10)
+        self.check_interval = 0.0
+        self.tracker = FaceTracker(
+            iou_threshold=face_config.get("track_iou", 0.3),
+            reencode_ttl=self.reencode_ttl,
+            max_missing=self.track_max_gap
+        )
+        self.viewer_cache = ViewerCache.from_config(face_config)
+        self.store = EncodingStore(face_config.get("encodings_dir", "encodings"))
+        self.camera = CameraSession.from_config(camera_config or {})
+        self.age_model = self._age_model_config(face_config)
+        self.workers = FaceWorkerPool(face_config.get("workers", 1), self.age_model)
+        
+        # All samples of all members stacked into one matrix, with a parallel
+        # label array; swapped as a single tuple so readers never see a mix
+        self._index = (None, [])
+        
+        # Set by reloads from the watcher thread; cached identities are
+        # dropped on the next check
+        self._identities_stale = False
+        self._watcher = None
         
         # Load known face encodings
         self._load_encodings()
         logger.info(f"FaceRecognizer initialized with {len(self.family)} family members")
     
+    @staticmethod
+    def _age_model_config(face_config: dict) -> dict | None:
+        """Age model files for the workers, or None if not installed."""
+        model = face_config.get("age_model")
+        if not model:
+            return None
+        
+        files = [model] + ([face_config["age_model_config"]] if face_config.get("age_model_config") else [])
+        missing = [f for f in files if not Path(f).is_file()]
+        if missing:
+            logger.warning(f"Age model not found ({', '.join(missing)}), unknown viewers can't be age-checked")
+            return None
+        
+        config = {
+            "model": model,
+            "config": face_config.get("age_model_config", ""),
+            "input_size": face_config.get("age_input_size", 227)
+        }
+        # Preprocessing of other models; the defaults fit the Caffe age_net
+        for key in ("mean", "scale", "swap_rb"):
+            if face_config.get(f"age_input_{key}") is not None:
+                config[key] = face_config[f"age_input_{key}"]
+        return config
+    
+    async def warm_up(self):
+        """Load the face models in the worker processes ahead of the first check."""
+        if not FACE_RECOGNITION_AVAILABLE:
+            return
+        started = time.monotonic()
+        await self.workers.warm_up()
+        logger.debug(f"Face models loaded in {time.monotonic() - started:.1f}s")
+
     def _load_encodings(self):
         """Load saved face encodings for family members."""
-        encodings_dir = Path("encodings")
+        if np is None:
+            logger.warning("numpy not installed, face matching disabled")
+            return
         
-        for member in self.family:
-            name = member.get("name")
-            encoding_file = encodings_dir / f"{name}.pkl"
-            
-            if encoding_file.exists():
-                import pickle
-                with open(encoding_file, "rb") as f:
-                    self.known_encodings[name] = pickle.load(f)
-                logger.debug(f"Loaded encoding for {name}")
+        if not self.store.exists():
+            self.store.migrate_legacy_pickles(list(self.members))
+        
+        try:
+            self._index = self.store.load()
+        except Exception as e:
+            logger.error(f"Could not load face encodings: {e}")
+            return
+        
+        for name, count in self.store.counts().items():
+            logger.debug(f"Loaded {count} encoding(s) for {name}")
+    
+    def reload_encodings(self):
+        """Load the current store and swap it in.
+        
+        Safe to call from any thread: the new matrix is mapped first and
+        then replaces the old (matrix, labels) pair in one assignment, so
+        a match in progress finishes on the previous data.
+        """
+        try:
+            index = self.store.load()
+        except Exception as e:
+            logger.error(f"Could not reload face encodings: {e}")
+            return
+        
+        self._index = index
+        self._identities_stale = True
+        logger.info(f"Reloaded face encodings ({len(index[1])} samples)")
+    
+    def update_family(self, family_config: list):
+        """Replace the family member profiles (e.g. after a config change)."""
+        self.family = family_config
+        self.members = {m["name"]: m for m in family_config if m.get("name")}
+        self._identities_stale = True
+        logger.info(f"Family updated: {len(self.members)} member(s)")
+    
+    def update_settings(self, face_config: dict):
+        """Apply edited `face` settings that don't need new workers or a new camera.
+        
+        Tracks and the cached viewer survive unless the change affects who
+        counts as a match or as a child.
+        """
+        tolerance = face_config.get("tolerance", 0.6)
+        max_child_age = face_config.get("max_child_age", 12)
+        if tolerance != self.tolerance or max_child_age != self.max_child_age:
+            self._identities_stale = True
+        
+        self.tolerance = tolerance
+        self.max_child_age = max_child_age
+        self.detection_scale = face_config.get("detection_scale", 0.5)
+        self.reencode_ttl = face_config.get("reencode_ttl", 30)
+        self.track_max_gap = face_config.get("track_max_gap", 10)
+        self._update_tracker_limits()
+        self.viewer_cache.ttl = face_config.get("viewer_ttl", 120)
+        self.viewer_cache.scene_change = face_config.get("scene_change", 0.03)
+    
+    def set_check_interval(self, seconds: float):
+        """Tell the tracker how far apart `identify_viewer` calls are.
+        
+        A face still in view must keep its track (and its identity) from
+        one check to the next, however long the interval is.
+        """
+        if seconds != self.check_interval:
+            self.check_interval = seconds
+            self._update_tracker_limits()
+    
+    def _update_tracker_limits(self):
+        self.tracker.max_missing = max(self.track_max_gap, TRACK_GAP_CHECKS * self.check_interval)
+        self.tracker.reencode_ttl = max(self.reencode_ttl, REENCODE_CHECKS * self.check_interval)
+    
+    def start_watching(self):
+        """Reload encodings whenever the store changes on disk.
+        
+        Picks up faces registered by another process, such as the web UI,
+        without restarting the daemon.
+        """
+        if self._watcher is None:
+            self._watcher = FileWatcher([self.store.index_path], lambda _: self.reload_encodings())
+            self._watcher.start()
+    
+    def _match_encodings(self, encodings) -> list[tuple[str, float] | None]:
+        """Find the closest known member for each face encoding.
+        
+        Computes all face-to-sample distances in one operation.
+        
+        Returns:
+            One (name, distance) per encoding, or None where nothing is
+            within tolerance
+        """
+        matrix, labels = self._index
+        if matrix is None or len(encodings) == 0:
+            return [None] * len(encodings)
+        
+        faces = np.asarray(encodings, dtype=np.float64)
+        distances = np.linalg.norm(faces[:, None, :] - matrix[None, :, :], axis=2)
+        best_rows = distances.argmin(axis=1)
+        
+        matches = []
+        for face_idx, row in enumerate(best_rows):
+            distance = float(distances[face_idx, row])
+            matches.append((labels[row], distance) if distance <= self.tolerance else None)
+        return matches
     
     async def identify_viewer(self) -> dict | None:
         """Capture webcam image and identify the viewer.
         
+        Every face in view is evaluated. The strictest applicable viewer
+        wins: any child over any adult, and the youngest child among
+        several, so an adult sitting next to a child doesn't lift
+        protection.
+        
         Returns:
-            dict with viewer info or None if no face detected
+            dict with viewer info or None if no face detected. All
+            evaluated viewers are listed under "viewers".
         """
         if cv2 is None:
             logger.warning("OpenCV not installed")
@@ -59,95 +254,161 @@ class FaceRecognizer:
         if frame is None:
             return None
         
-        # Try to identify known family member
-        viewer = await self._identify_face(frame)
+        if self._identities_stale:
+            self._identities_stale = False
+            self.tracker.reset()
+            self.viewer_cache.invalidate()
         
-        if viewer:
-            return viewer
+        # Same scene as last time - same people are watching
+        cached = self.viewer_cache.get(frame)
+        if cached is not None:
+            metrics.event("viewer_cache_hit")
+            return cached
         
-        # Unknown face - estimate age
-        age = await self._estimate_age(frame)
-        if age is not None:
-            return {
-                "name": "Unknown",
-                "age": age,
-                "is_child": age < 12,
-                "confidence": 0.6
-            }
+        # Known family members are matched, unknown faces get an age estimate
+        tracks = await self._identify_face(frame)
+        viewers = [v for v in map(self._viewer_for_track, tracks) if v]
+        if not viewers:
+            self.viewer_cache.invalidate()
+            return None
         
-        return None
+        viewers.sort(key=lambda v: (not v["is_child"], v["age"]))
+        if len(viewers) > 1:
+            logger.debug("Viewers: " + ", ".join(f"{v['name']} ({v['age']})" for v in viewers))
+        
+        viewer = {**viewers[0], "viewers": viewers}
+        self.viewer_cache.put(frame, viewer)
+        return viewer
     
     async def _capture_webcam(self):
-        """Capture a frame from the webcam."""
+        """Get the latest frame from the camera session."""
         if cv2 is None:
             return None
         
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
-            logger.warning("Could not open webcam")
-            return None
-        
-        ret, frame = cap.read()
-        cap.release()
-        
-        if not ret:
+        frame = await self.camera.get_frame()
+        if frame is None:
             logger.warning("Could not read from webcam")
-            return None
         
         return frame
+
+    def release_camera(self):
+        """Release the webcam (e.g. while YouTube is not active)."""
+        self.viewer_cache.invalidate()
+        if self.camera.running:
+            logger.debug("Releasing camera")
+            logger.debug(f"Viewer cache: {self.viewer_cache.hits} hit(s), {self.viewer_cache.misses} miss(es)")
+            self.camera.stop()
+
+    def close(self):
+        """Release the webcam and stop the worker processes."""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        self.release_camera()
+        self.workers.shutdown()
     
-    async def _identify_face(self, frame) -> dict | None:
-        """Try to identify a known family member."""
-        if face_recognition is None:
+    async def _identify_face(self, frame) -> list:
+        """Detect, track and identify every face in the frame.
+        
+        Returns:
+            The tracks of all faces in view, with `match` set for family
+            members and `extra["age"]` for unknown faces
+        """
+        if not FACE_RECOGNITION_AVAILABLE:
             logger.warning("face_recognition not installed")
-            return None
+            return []
+        
+        # The frame is shared with the worker processes, not pickled
+        with self.workers.share(frame) as frame_ref:
+            # Find faces
+            with metrics.timer("face_detect"):
+                face_locations = await self.workers.run(detect_faces, frame_ref, self.detection_scale)
+            if not face_locations:
+                logger.debug("No faces detected")
+                return []
+            
+            # Follow faces across checks; only new or expired tracks are encoded,
+            # everyone else keeps their cached identity
+            now = time.monotonic()
+            tracks = self.tracker.update(face_locations, now)
+            stale = [t for t in tracks if self.tracker.needs_encoding(t, now)]
+            
+            if stale:
+                with metrics.timer("face_encode"):
+                    face_encodings = await self.workers.run(encode_faces, frame_ref, [t.box for t in stale])
+                # Compare every face with every known sample at once
+                for track, match in zip(stale, self._match_encodings(face_encodings)):
+                    track.match = match
+                    track.encoded_at = now
+                logger.debug(f"Encoded {len(stale)} of {len(tracks)} tracked face(s)")
+            
+            await self._estimate_ages(frame_ref, tracks)
         
-        # Convert BGR to RGB
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        return tracks
+    
+    def _viewer_for_track(self, track) -> dict | None:
+        """Viewer info for one tracked face, or None if it can't be judged."""
+        if track.match and track.match[0] in self.members:
+            name, distance = track.match
+            member = self.members[name]
+            return {
+                "name": member["name"],
+                "age": member.get("age", 0),
+                "is_child": member.get("is_child", False),
+                "confidence": distance_to_confidence(distance, self.tolerance),
+                "distance": distance
+            }
         
-        # Find faces
-        face_locations = face_recognition.face_locations(rgb_frame)
-        if not face_locations:
-            logger.debug("No faces detected")
+        # Unknown face - go by the age estimate
+        age = track.extra.get("age")
+        if age is None:
             return None
         
-        # Get encodings
-        face_encodings = face_recognition.face_encodings(rgb_frame, face_locations)
-        
-        for encoding in face_encodings:
-            # Compare with known faces
-            for name, known_encoding in self.known_encodings.items():
-                matches = face_recognition.compare_faces([known_encoding], encoding)
-                if matches[0]:
-                    # Found a match
-                    member = next((m for m in self.family if m["name"] == name), None)
-                    if member:
-                        return {
-                            "name": member["name"],
-                            "age": member.get("age", 0),
-                            "is_child": member.get("is_child", False),
-                            "confidence": 0.9
-                        }
-        
-        return None
-    
-    async def _estimate_age(self, frame) -> int | None:
-        """Estimate age using Claude Vision or DeepFace.
-        
-        TODO: Implement age estimation
-        - Option 1: Use Claude Vision API
-        - Option 2: Use DeepFace library
+        age = round(age)
+        return {
+            "name": "Unknown",
+            "age": age,
+            "is_child": age < self.max_child_age,
+            "confidence": 0.6
+        }
+    
+    async def _estimate_ages(self, frame_ref, tracks: list):
+        """Estimate ages of unknown faces with the local age model.
+        
+        All faces without an estimate go through the model in one batch.
+        The estimate is cached on the track and dropped when the face is
+        re-identified, so a viewer who stays in view is estimated once per
+        re-encode TTL.
         """
-        # Placeholder - return None for now
-        logger.debug("Age estimation not yet implemented")
-        return None
+        if self.age_model is None:
+            return
+        
+        for track in tracks:
+            if track.match is not None or track.extra.get("age_at") != track.encoded_at:
+                track.extra.pop("age", None)
+        
+        pending = [t for t in tracks if t.match is None and "age" not in t.extra]
+        if not pending:
+            return
+        
+        start = time.perf_counter()
+        with metrics.timer("age_estimate"):
+            ages = await self.workers.run(estimate_ages, frame_ref, [t.box for t in pending])
+        for track, age in zip(pending, ages):
+            track.extra["age"] = age
+            track.extra["age_at"] = track.encoded_at
+        
+        logger.debug(
+            f"Estimated {len(pending)} age(s) in {(time.perf_counter() - start) * 1000:.0f}ms: "
+            + ", ".join(f"{age:.0f}" for age in ages)
+        )
     
     async def register_face(self, name: str, age: int, is_child: bool = True):
         """Register a new family member's face.
         
         Captures webcam and saves the face encoding.
         """
-        if face_recognition is None:
+        if not FACE_RECOGNITION_AVAILABLE:
             logger.error("face_recognition not installed")
             return False
         
@@ -155,23 +416,21 @@ class FaceRecognizer:
         if frame is None:
             return False
         
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        
-        face_locations = face_recognition.face_locations(rgb_frame)
-        if not face_locations:
-            logger.error("No face detected for registration")
-            return False
-        
-        encoding = face_recognition.face_encodings(rgb_frame, face_locations)[0]
-        
-        # Save encoding
-        encodings_dir = Path("encodings")
-        encodings_dir.mkdir(exist_ok=True)
+        with self.workers.share(frame) as frame_ref:
+            # Full resolution: registration quality matters more than speed
+            face_locations = await self.workers.run(detect_faces, frame_ref, 1.0)
+            if not face_locations:
+                logger.error("No face detected for registration")
+                return False
+            
+            encoding = (await self.workers.run(encode_faces, frame_ref, face_locations[:1]))[0]
         
-        import pickle
-        with open(encodings_dir / f"{name}.pkl", "wb") as f:
-            pickle.dump(encoding, f)
+        # Save encoding as another sample for this member
+        count = self.store.add_samples(name, encoding)
         
-        self.known_encodings[name] = encoding
-        logger.info(f"Registered face for {name}")
+        self.members.setdefault(name, {"name": name, "age": age, "is_child": is_child})
+        self._index = self.store.load()
+        self.tracker.reset()
+        self.viewer_cache.invalidate()
+        logger.info(f"Registered face sample {count} for {name}")
         return True
@@ -0,0 +1,102 @@
+"""Face tracking module.
+
+Follows faces across webcam frames by box overlap, so a viewer who stays
+in front of the screen is only encoded and matched once per TTL.
+"""
+
+import itertools
+import time
+from dataclasses import dataclass, field
+
+
+@dataclass
+class FaceTrack:
+    """A face followed across frames.
+
+    `box` uses face_recognition's (top, right, bottom, left) order in
+    full-resolution frame coordinates. `match` caches the last identity
+    result: (name, distance) for a family member, None for an unknown face.
+    """
+
+    track_id: int
+    box: tuple
+    first_seen: float
+    last_seen: float
+    match: tuple | None = None
+    encoded_at: float | None = None
+    extra: dict = field(default_factory=dict)
+
+
+def iou(a: tuple, b: tuple) -> float:
+    """Intersection over union of two (top, right, bottom, left) boxes."""
+    top, bottom = max(a[0], b[0]), min(a[2], b[2])
+    left, right = max(a[3], b[3]), min(a[1], b[1])
+    if bottom <= top or right <= left:
+        return 0.0
+
+    inter = (bottom - top) * (right - left)
+    area_a = (a[2] - a[0]) * (a[1] - a[3])
+    area_b = (b[2] - b[0]) * (b[1] - b[3])
+    return inter / float(area_a + area_b - inter)
+
+
+class FaceTracker:
+    """Greedy IoU tracker for a handful of faces."""
+
+    def __init__(self, iou_threshold: float = 0.3, reencode_ttl: float = 30.0, max_missing: float = 10.0):
+        self.iou_threshold = iou_threshold
+        self.reencode_ttl = reencode_ttl
+        self.max_missing = max_missing
+        self.tracks: list[FaceTrack] = []
+        self._ids = itertools.count(1)
+
+    def update(self, boxes: list[tuple], now: float | None = None) -> list[FaceTrack]:
+        """Assign detected boxes to tracks.
+
+        Returns:
+            One track per box, in the same order as `boxes`
+        """
+        now = time.monotonic() if now is None else now
+
+        # Forget faces that left the frame
+        self.tracks = [t for t in self.tracks if now - t.last_seen <= self.max_missing]
+
+        pairs = sorted(
+            (
+                (iou(track.box, box), ti, bi)
+                for ti, track in enumerate(self.tracks)
+                for bi, box in enumerate(boxes)
+            ),
+            reverse=True,
+        )
+
+        assigned: dict[int, FaceTrack] = {}
+        used_tracks = set()
+        for overlap, ti, bi in pairs:
+            if overlap < self.iou_threshold:
+                break
+            if ti in used_tracks or bi in assigned:
+                continue
+            track = self.tracks[ti]
+            track.box = boxes[bi]
+            track.last_seen = now
+            assigned[bi] = track
+            used_tracks.add(ti)
+
+        for bi, box in enumerate(boxes):
+            if bi not in assigned:
+                track = FaceTrack(next(self._ids), box, first_seen=now, last_seen=now)
+                self.tracks.append(track)
+                assigned[bi] = track
+
+        return [assigned[bi] for bi in range(len(boxes))]
+
+    def needs_encoding(self, track: FaceTrack, now: float | None = None) -> bool:
+        """True for new tracks and tracks whose cached identity expired."""
+        if track.encoded_at is None:
+            return True
+        now = time.monotonic() if now is None else now
+        return now - track.encoded_at > self.reencode_ttl
+
+    def reset(self):
+        self.tracks = []
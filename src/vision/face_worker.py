@@ -0,0 +1,199 @@
+"""Face recognition worker processes.
+
+Detection, encoding and age estimation are CPU-bound model calls that
+would block the asyncio loop for hundreds of milliseconds. They run in a
+process pool whose workers load the models once at startup. Frames travel
+through shared memory; only boxes, encodings and ages are pickled back.
+"""
+
+import asyncio
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from loguru import logger
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Levi & Hassner age classes (Caffe "age_net"); an estimate is the
+# probability-weighted mean of the bucket midpoints
+AGE_BUCKET_MIDPOINTS = [1, 5, 10, 17.5, 28.5, 40.5, 50.5, 80]
+AGE_MODEL_MEAN = (78.4263377603, 87.7689143744, 114.895847746)
+
+# Loaded in each worker by _init_worker
+cv2 = None
+face_recognition = None
+age_net = None
+age_input = {"size": 227, "mean": AGE_MODEL_MEAN, "scale": 1.0, "swap_rb": False}
+
+
+def _init_worker(age_model: dict | None = None):
+    """Import and warm up the models once per worker process.
+
+    An age model that can't be loaded only disables age estimation;
+    detection and encoding keep working.
+    """
+    global cv2, face_recognition, age_net
+    import cv2 as _cv2
+    import face_recognition as _face_recognition
+
+    cv2 = _cv2
+    face_recognition = _face_recognition
+
+    # First call initializes dlib's detector; do it before real work arrives
+    face_recognition.face_locations(np.zeros((64, 64, 3), dtype=np.uint8))
+
+    if age_model:
+        try:
+            net = cv2.dnn.readNet(age_model["model"], age_model.get("config", ""))
+            net.setPreferableBackend(cv2.dnn.DNN_BACKEND_OPENCV)
+            net.setPreferableTarget(cv2.dnn.DNN_TARGET_CPU)
+        except Exception as e:
+            logger.error(f"Could not load age model {age_model['model']}: {e}")
+            return
+        age_net = net
+        age_input.update(
+            size=age_model.get("input_size", 227),
+            mean=tuple(age_model.get("mean", AGE_MODEL_MEAN)),
+            scale=age_model.get("scale", 1.0),
+            swap_rb=age_model.get("swap_rb", False),
+        )
+
+
+@contextlib.contextmanager
+def _attach(ref, rgb: bool = True):
+    """Map a shared frame (BGR) and yield a private RGB (or BGR) copy."""
+    name, shape, dtype = ref
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        frame = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        image = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) if rgb else frame.copy()
+        del frame  # release the buffer export before closing
+        yield image
+    finally:
+        shm.close()
+
+
+def detect_faces(ref, scale: float = 1.0) -> list[tuple]:
+    """Detect faces, optionally on a downscaled copy.
+
+    Returns:
+        (top, right, bottom, left) boxes in full-resolution coordinates
+    """
+    with _attach(ref) as rgb:
+        if scale >= 1.0:
+            return face_recognition.face_locations(rgb)
+
+        small = cv2.resize(rgb, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        height, width = rgb.shape[:2]
+        return [
+            (
+                max(0, int(top / scale)),
+                min(width, int(right / scale)),
+                min(height, int(bottom / scale)),
+                max(0, int(left / scale)),
+            )
+            for top, right, bottom, left in face_recognition.face_locations(small)
+        ]
+
+
+def encode_faces(ref, boxes: list[tuple]) -> list[list[float]]:
+    """Compute 128-d encodings for the given boxes at full resolution."""
+    with _attach(ref) as rgb:
+        return [e.tolist() for e in face_recognition.face_encodings(rgb, boxes)]
+
+
+def estimate_ages(ref, boxes: list[tuple], padding: float = 0.4) -> list[float]:
+    """Estimate the age of every given face in one batched forward pass."""
+    if age_net is None or not boxes:
+        return []
+
+    with _attach(ref, rgb=False) as bgr:
+        height, width = bgr.shape[:2]
+        crops = []
+        for top, right, bottom, left in boxes:
+            # The model was trained on loosely cropped faces
+            pad_y = int((bottom - top) * padding)
+            pad_x = int((right - left) * padding)
+            crops.append(bgr[
+                max(0, top - pad_y):min(height, bottom + pad_y),
+                max(0, left - pad_x):min(width, right + pad_x)
+            ])
+
+    size = age_input["size"]
+    blob = cv2.dnn.blobFromImages(
+        crops, age_input["scale"], (size, size), age_input["mean"], swapRB=age_input["swap_rb"]
+    )
+    age_net.setInput(blob)
+    output = age_net.forward().reshape(len(crops), -1)
+
+    if output.shape[1] == 1:
+        # Regression model: the output is the age itself
+        return [float(v) for v in output[:, 0]]
+
+    midpoints = np.asarray(AGE_BUCKET_MIDPOINTS[:output.shape[1]])
+    return [float(p @ midpoints / p.sum()) for p in output]
+
+
+def _ready() -> bool:
+    """No-op task; returns once the worker has loaded its models."""
+    return face_recognition is not None
+
+
+class FaceWorkerPool:
+    """Process pool for face detection, encoding and age estimation."""
+
+    def __init__(self, workers: int = 1, age_model: dict | None = None):
+        self.workers = max(1, workers)
+        self.age_model = age_model
+        self._executor = None
+
+    def start(self):
+        if self._executor is not None:
+            return
+
+        # Start the resource tracker before any worker exists, so workers
+        # share it and don't unlink frames they merely attached to
+        resource_tracker.ensure_running()
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self.age_model,),
+        )
+        logger.info(f"Face worker pool started ({self.workers} process(es))")
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    @contextlib.contextmanager
+    def share(self, frame):
+        """Copy a frame into shared memory for the duration of the block.
+
+        Yields:
+            A small reference tuple to pass to worker functions
+        """
+        shm = shared_memory.SharedMemory(create=True, size=frame.nbytes)
+        try:
+            view = np.ndarray(frame.shape, dtype=frame.dtype, buffer=shm.buf)
+            view[:] = frame
+            del view
+            yield (shm.name, frame.shape, frame.dtype.str)
+        finally:
+            shm.close()
+            shm.unlink()
+
+    async def warm_up(self):
+        """Start every worker now, so the first frame doesn't wait for model loading."""
+        await asyncio.gather(*(self.run(_ready) for _ in range(self.workers)))
+
+    async def run(self, func, *args):
+        """Run a worker function without blocking the event loop."""
+        self.start()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
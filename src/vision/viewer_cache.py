@@ -0,0 +1,95 @@
+"""Viewer cache module.
+
+Who is watching rarely changes mid-video. The cache keeps the last
+identification together with a tiny grayscale thumbnail of the frame it
+came from, and hands it back as long as the scene still looks the same.
+"""
+
+import time
+from loguru import logger
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class ViewerCache:
+    """Presence-aware cache for the last identified viewer.
+
+    A cached viewer is reused while the new frame differs from the
+    identified one in less than `scene_change` of its thumbnail cells
+    (someone sitting down, leaving or the camera moving all count as a
+    change), and never for longer than `ttl` seconds.
+    """
+
+    THUMB_SIZE = (32, 24)
+
+    def __init__(self, ttl: float = 120.0, scene_change: float = 0.03, pixel_threshold: int = 25):
+        self.ttl = ttl
+        self.scene_change = scene_change
+        self.pixel_threshold = pixel_threshold
+        self.hits = 0
+        self.misses = 0
+
+        self._viewer = None
+        self._thumb = None
+        self._identified_at = 0.0
+
+    @classmethod
+    def from_config(cls, config: dict) -> "ViewerCache":
+        """Build a cache from the `face` config section."""
+        return cls(
+            ttl=config.get("viewer_ttl", 120),
+            scene_change=config.get("scene_change", 0.03),
+        )
+
+    def _thumbnail(self, frame):
+        small = cv2.resize(frame, self.THUMB_SIZE, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small.astype(np.int16)
+
+    def _changed_fraction(self, thumb) -> float:
+        return float(np.mean(np.abs(thumb - self._thumb) > self.pixel_threshold))
+
+    def get(self, frame, now: float | None = None) -> dict | None:
+        """Return the cached viewer if the same scene is still in front of the camera."""
+        if self._viewer is None or cv2 is None or np is None:
+            return None
+
+        now = time.monotonic() if now is None else now
+        if now - self._identified_at > self.ttl:
+            logger.debug("Viewer cache expired")
+            self.invalidate()
+            self.misses += 1
+            return None
+
+        changed = self._changed_fraction(self._thumbnail(frame))
+        if changed > self.scene_change:
+            logger.debug(f"Scene changed ({changed:.0%} of the frame), re-identifying viewer")
+            self.invalidate()
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self._viewer
+
+    def put(self, frame, viewer: dict | None, now: float | None = None):
+        """Remember a fresh identification; empty results are not cached."""
+        if viewer is None or cv2 is None or np is None:
+            self.invalidate()
+            return
+
+        self._viewer = viewer
+        self._thumb = self._thumbnail(frame)
+        self._identified_at = time.monotonic() if now is None else now
+
+    def invalidate(self):
+        self._viewer = None
+        self._thumb = None
@@ -19,6 +19,7 @@ const translations = {
         'tab.rules': '自定義規則',
         'tab.notifications': '通知設定',
         'tab.templates': '快速模板',
+        'tab.decisions': '待決判斷',
 
         // Basic Settings
         'basic.title': '基本設定',
@@ -147,6 +148,7 @@ const translations = {
         'tab.rules': 'Custom Rules',
         'tab.notifications': 'Notifications',
         'tab.templates': 'Quick Templates',
+        'tab.decisions': 'Pending Decisions',
 
         // Basic Settings
         'basic.title': 'Basic Settings',
@@ -23,6 +23,10 @@ function initializeTabs() {
             btn.classList.add('active');
             const tabId = btn.dataset.tab;
             document.getElementById(tabId).classList.add('active');
+
+            // Only poll the monitor while its tab is open
+            if (tabId === 'decisions') startDecisionPolling();
+            else stopDecisionPolling();
         });
     });
 }
@@ -152,7 +156,8 @@ function populateForm(config) {
     }
 }
 
-// Build Config from Form
+// Build Config from Form (only the settings the form edits; the server
+// merges them into the saved config, so the rest of config.yaml is kept)
 function buildConfigFromForm() {
     const config = {
         claude: {
@@ -163,13 +168,10 @@ function buildConfigFromForm() {
         rules: {
             max_child_age: parseInt(getValueById('maxChildAge')),
             action: getValueById('action'),
-            check_interval: parseInt(getValueById('checkInterval')),
-            clip_duration: 5
+            check_interval: parseInt(getValueById('checkInterval'))
         },
         safe_channels: getSafeChannels(),
         analysis: {
-            block_categories: ['violence', 'horror', 'adult', 'drugs', 'gambling'],
-            warn_categories: ['excessive_consumerism', 'clickbait', 'loud_content'],
             confidence_threshold: parseFloat(getValueById('confidenceThreshold')),
             custom_rules: {
                 language: {
@@ -214,17 +216,6 @@ function buildConfigFromForm() {
             },
             include_screenshot: getCheckedById('includeScreenshot'),
             block_only: getCheckedById('blockOnly')
-        },
-        privacy: {
-            delete_clips: true,
-            anonymize_logs: false,
-            local_only: true
-        },
-        logging: {
-            level: 'INFO',
-            file: 'logs/kidguard.log',
-            max_size_mb: 10,
-            backup_count: 5
         }
     };
 
@@ -638,6 +629,83 @@ function getCheckedValues(selector) {
         .map(cb => cb.value);
 }
 
+// Pending decisions (live monitor)
+let decisionTimer = null;
+
+function startDecisionPolling() {
+    loadDecisions();
+    if (!decisionTimer) decisionTimer = setInterval(loadDecisions, 2000);
+}
+
+function stopDecisionPolling() {
+    clearInterval(decisionTimer);
+    decisionTimer = null;
+}
+
+async function loadDecisions() {
+    try {
+        const response = await fetch('/api/decisions');
+        const data = await response.json();
+        renderDecisions(data);
+    } catch (error) {
+        showStatus('讀取待決判斷失敗: ' + error.message, 'error');
+    }
+}
+
+function renderDecisions(data) {
+    const list = document.getElementById('decisionsList');
+    if (!data.running) {
+        list.innerHTML = '<p class="help-text">即時監控程式未執行</p>';
+        return;
+    }
+    if (data.pending.length === 0) {
+        list.innerHTML = '<p class="help-text">目前沒有待決判斷</p>';
+        return;
+    }
+
+    list.innerHTML = '';
+    data.pending.forEach(item => {
+        const suggested = item.suggested_action
+            ? `建議: <strong>${item.suggested_action}</strong>（${item.reason}）`
+            : '無建議動作';
+        const div = document.createElement('div');
+        div.className = 'list-item';
+        div.innerHTML = `
+            <div class="list-item-content">
+                <strong>#${item.id} ${item.title || '（無標題）'}</strong>
+                ${item.channel ? ' - ' + item.channel : ''}<br>
+                <span class="help-text">${suggested}，${Math.round(item.expires_in)} 秒後逾時</span>
+            </div>
+            <div class="list-item-actions">
+                ${['ok', 'warn', 'pause', 'redirect', 'close'].map(command => `
+                    <button class="${command === 'ok' ? 'btn-small' : 'btn-remove'}"
+                            onclick="answerDecision(${item.id}, '${command}')">${command}</button>
+                `).join('')}
+            </div>
+        `;
+        list.appendChild(div);
+    });
+}
+
+async function answerDecision(id, command) {
+    try {
+        const response = await fetch(`/api/decisions/${id}`, {
+            method: 'POST',
+            headers: {'Content-Type': 'application/json'},
+            body: JSON.stringify({command})
+        });
+        const data = await response.json();
+        if (data.success) {
+            showStatus(`#${id} 已回覆: ${command}`, 'success');
+        } else {
+            showStatus(data.error, 'warning');
+        }
+    } catch (error) {
+        showStatus('回覆失敗: ' + error.message, 'error');
+    }
+    loadDecisions();
+}
+
 function showStatus(message, type) {
     const statusBar = document.getElementById('statusBar');
     const statusText = document.getElementById('statusText');
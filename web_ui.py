@@ -16,6 +16,9 @@ from loguru import logger
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
 
+from src.monitor.decisions import ANSWERS, DEFAULT_HOST, DEFAULT_PORT, send_request
+from src.settings import ConfigError, Settings
+
 app = Flask(__name__,
             template_folder='web/templates',
             static_folder='web/static')
@@ -24,6 +27,28 @@ CONFIG_PATH = Path("config/config.yaml")
 EXAMPLE_CONFIG_PATH = Path("config/config.example.yaml")
 
 
+def _load_saved_config() -> dict:
+    """The saved config, or the example config if there is none yet."""
+    path = CONFIG_PATH if CONFIG_PATH.exists() else EXAMPLE_CONFIG_PATH
+    with open(path, 'r', encoding='utf-8') as f:
+        return yaml.safe_load(f) or {}
+
+
+def _merge_config(base: dict, update: dict) -> dict:
+    """Overlay the settings form on a config.
+
+    Mappings are merged key by key; everything else (lists included) is
+    replaced. Sections and keys the form doesn't edit are kept.
+    """
+    merged = dict(base)
+    for key, value in update.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge_config(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
 @app.route('/')
 def index():
     """Main settings page."""
@@ -34,13 +59,8 @@ def index():
 def get_config():
     """Get current configuration."""
     try:
-        if CONFIG_PATH.exists():
-            with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
-        else:
-            # Load example config as default
-            with open(EXAMPLE_CONFIG_PATH, 'r', encoding='utf-8') as f:
-                config = yaml.safe_load(f)
+        # Falls back to the example config as default
+        config = _load_saved_config()
 
         return jsonify({
             'success': True,
@@ -59,21 +79,37 @@ def get_config():
 def save_config():
     """Save configuration."""
     try:
-        config = request.json
+        form = request.json
 
         # Validate config structure
-        if not isinstance(config, dict):
+        if not isinstance(form, dict):
             return jsonify({
                 'success': False,
                 'error': 'Invalid configuration format'
             }), 400
 
+        # The form only covers part of the config; a running KidGuard would
+        # otherwise reload everything else (face, power, ...) as defaults
+        config = _merge_config(_load_saved_config(), form)
+
+        # Reject settings KidGuard would refuse to load
+        try:
+            Settings.from_config(config)
+        except ConfigError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+
         # Ensure config directory exists
         CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-        # Save config
-        with open(CONFIG_PATH, 'w', encoding='utf-8') as f:
+        # Save config; written to a temp file and swapped in, so a running
+        # KidGuard reloading it never reads a half-written file
+        tmp_path = CONFIG_PATH.with_name(f".{CONFIG_PATH.name}.tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
             yaml.dump(config, f, allow_unicode=True, default_flow_style=False, sort_keys=False)
+        os.replace(tmp_path, CONFIG_PATH)
 
         logger.info(f"Configuration saved to {CONFIG_PATH}")
 
@@ -118,7 +154,7 @@ def get_templates():
 def validate_config():
     """Validate configuration."""
     try:
-        config = request.json
+        config = _merge_config(_load_saved_config(), request.json)
 
         errors = []
         warnings = []
@@ -196,6 +232,48 @@ def test_claude_api():
         }), 500
 
 
+def _decision_address():
+    """Where the live monitor's decision socket listens (from the config)."""
+    section = {}
+    if CONFIG_PATH.exists():
+        with open(CONFIG_PATH, 'r', encoding='utf-8') as f:
+            section = (yaml.safe_load(f) or {}).get('live_monitor') or {}
+    return section.get('decision_host', DEFAULT_HOST), section.get('decision_port', DEFAULT_PORT)
+
+
+@app.route('/api/decisions', methods=['GET'])
+def list_decisions():
+    """Videos a running live monitor is waiting on a parent for."""
+    host, port = _decision_address()
+    try:
+        reply = send_request({'op': 'list'}, host, port)
+    except OSError:
+        # No monitor running
+        return jsonify({'success': True, 'running': False, 'pending': []})
+
+    return jsonify({'success': True, 'running': True, 'pending': reply.get('pending', [])})
+
+
+@app.route('/api/decisions/<int:decision_id>', methods=['POST'])
+def answer_decision(decision_id):
+    """Answer a pending decision (close / redirect / pause / warn / ok)."""
+    command = str((request.json or {}).get('command', '')).strip().lower()
+    if command not in ANSWERS:
+        return jsonify({'success': False, 'error': f'不支援的指令：{command}'}), 400
+
+    host, port = _decision_address()
+    try:
+        reply = send_request(
+            {'op': 'answer', 'id': decision_id, 'command': command, 'via': 'web'}, host, port
+        )
+    except OSError as e:
+        return jsonify({'success': False, 'error': f'監控程式未執行：{e}'}), 503
+
+    if not reply.get('ok'):
+        return jsonify({'success': False, 'error': '此項目已回覆或已逾時'}), 404
+    return jsonify({'success': True})
+
+
 @app.route('/api/family/capture', methods=['POST'])
 def capture_family_member():
     """Capture face for family member registration."""
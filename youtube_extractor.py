@@ -10,6 +10,9 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.common.exceptions import TimeoutException, NoSuchElementException
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import queue
+import sys
 import time
 
 
@@ -46,12 +49,13 @@ class YouTubeExtractor:
             self.driver = None
             print("✓ Selenium WebDriver 已關閉")
 
-    def extract_video_info(self, video_url):
+    def extract_video_info(self, video_url, timeout=10):
         """
         從 YouTube 影片頁面提取資訊
 
         Args:
             video_url: YouTube 影片 URL
+            timeout: 頁面載入與等待元素的逾時秒數
 
         Returns:
             dict: 包含影片資訊的字典
@@ -69,11 +73,12 @@ class YouTubeExtractor:
         }
 
         try:
-            # 載入影片頁面
+            # 載入影片頁面（超過 timeout 就放棄，避免卡住整個池）
+            self.driver.set_page_load_timeout(timeout)
             self.driver.get(video_url)
 
             # 等待頁面載入
-            wait = WebDriverWait(self.driver, 10)
+            wait = WebDriverWait(self.driver, timeout)
 
             # 提取影片標題
             try:
@@ -142,8 +147,153 @@ class YouTubeExtractor:
         return None
 
 
+class YouTubeExtractorPool:
+    """YouTube 資訊提取器池
+
+    預先啟動 N 個瀏覽器並保持常駐，多個 URL 同時提取，
+    適合一次預先審查整個播放清單或觀看記錄。
+    """
+
+    def __init__(self, size=4, headless=True, timeout=10):
+        """
+        Args:
+            size: 常駐瀏覽器數量（同時提取的數量）
+            headless: 是否以無頭模式運行
+            timeout: 每個 URL 的逾時秒數
+        """
+        self.size = size
+        self.headless = headless
+        self.timeout = timeout
+        self.extractors = []
+        self._idle = queue.Queue()
+        self._executor = None
+
+    def start(self):
+        """平行啟動所有瀏覽器（任一個啟動失敗時，已啟動的會全部關閉）"""
+        self.extractors = [YouTubeExtractor(headless=self.headless) for _ in range(self.size)]
+        try:
+            with ThreadPoolExecutor(max_workers=self.size) as starter:
+                list(starter.map(lambda extractor: extractor.start(), self.extractors))
+        except Exception:
+            # __exit__ 不會執行（__enter__ 已失敗），在這裡收尾
+            self.stop()
+            raise
+
+        for extractor in self.extractors:
+            self._idle.put(extractor)
+
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="yt-extract")
+        print(f"✓ 提取器池已啟動（{self.size} 個瀏覽器）")
+
+    def stop(self):
+        """關閉所有瀏覽器"""
+        if self._executor:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+        for extractor in self.extractors:
+            extractor.stop()
+        self.extractors = []
+        self._idle = queue.Queue()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+
+    def _extract(self, video_url):
+        """借用一個閒置的瀏覽器提取單一 URL"""
+        extractor = self._idle.get()
+        started = time.monotonic()
+        try:
+            info = extractor.extract_video_info(video_url, timeout=self.timeout)
+        finally:
+            self._idle.put(extractor)
+        info['elapsed'] = time.monotonic() - started
+        return info
+
+    def iter_extract(self, video_urls):
+        """
+        同時提取多個 URL，依完成順序逐一返回結果
+
+        video_urls 可以是任何可迭代物件（包含產生器），
+        同時進行中的工作數量上限為池大小的兩倍，不會一次讀完整個串流。
+
+        Args:
+            video_urls: YouTube 影片 URL 的可迭代物件
+
+        Yields:
+            dict: 與 YouTubeExtractor.extract_video_info 相同格式，另含 'elapsed' 秒數
+        """
+        if not self._executor:
+            raise RuntimeError("提取器池未啟動，請先調用 start()")
+
+        max_in_flight = self.size * 2
+        in_flight = set()
+
+        for video_url in video_urls:
+            in_flight.add(self._executor.submit(self._extract, video_url))
+            if len(in_flight) >= max_in_flight:
+                done = next(as_completed(in_flight))
+                in_flight.discard(done)
+                yield done.result()
+
+        for future in as_completed(in_flight):
+            yield future.result()
+
+
+def read_watch_history(path):
+    """
+    從觀看記錄匯出檔讀取影片 URL
+
+    支援 Google Takeout 的 watch-history.json，
+    或每行一個 URL 的純文字檔。
+
+    Args:
+        path: 匯出檔路徑
+
+    Yields:
+        str: YouTube 影片 URL
+    """
+    import json
+
+    with open(path, 'r', encoding='utf-8') as f:
+        if str(path).lower().endswith('.json'):
+            for entry in json.load(f):
+                url = entry.get('titleUrl')
+                if url and 'watch?v=' in url:
+                    yield url
+        else:
+            for line in f:
+                url = line.strip()
+                if url and not url.startswith('#'):
+                    yield url
+
+
+def bulk_main(path, pool_size=4):
+    """批次預審：同時提取觀看記錄中的所有影片"""
+    started = time.monotonic()
+    count = 0
+
+    with YouTubeExtractorPool(size=pool_size) as pool:
+        for info in pool.iter_extract(read_watch_history(path)):
+            count += 1
+            status = "✓" if info['success'] else "✗"
+            print(f"{status} [{info['elapsed']:.1f}s] {info['title']} - {info['channel']}")
+
+    elapsed = time.monotonic() - started
+    print(f"\n共提取 {count} 部影片，耗時 {elapsed:.1f} 秒")
+
+
 def main():
     """測試腳本"""
+    # 指定觀看記錄檔時改用批次模式：python youtube_extractor.py watch-history.json [池大小]
+    if len(sys.argv) > 1:
+        bulk_main(sys.argv[1], int(sys.argv[2]) if len(sys.argv) > 2 else 4)
+        return
+
     # 創建提取器
     extractor = YouTubeExtractor(headless=False)  # 顯示瀏覽器視窗以便觀察
     extractor.start()